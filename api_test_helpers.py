@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+API 測試共用工具 - 基礎 URL、授權標頭，以及建立測試活動、學生與獎項的方法
+"""
+
+import os
+
+import requests
+
+# API 基礎 URL
+BASE_URL = "http://127.0.0.1:8000/lottery"
+HEADERS = {"Authorization": os.environ.get("LOTTERY_TOKEN", "")}
+
+# 預設學號前綴與獎項
+STUDENT_ID_PREFIX = "41200"
+DEFAULT_PRIZES = [{"name": "頭獎", "quantity": 1}, {"name": "二獎", "quantity": 2}]
+
+
+def student_id(index, prefix=STUDENT_ID_PREFIX):
+    """第 index 位測試學生的學號"""
+    return f"{prefix}{index:04d}"
+
+
+def make_students(count, prefix=STUDENT_ID_PREFIX):
+    """產生 count 位測試學生"""
+    return [{"id": student_id(i, prefix), "name": f"測試學生{i}", "department": "資工系", "grade": "3"}
+            for i in range(count)]
+
+
+def create_event(name, description="測試活動"):
+    """創建測試活動，回傳活動 ID"""
+    event_data = {
+        "academic_year_term": "113-1",
+        "name": name,
+        "description": description,
+        "event_date": "2024-12-31T10:00:00",
+        "type": "general"
+    }
+    response = requests.post(f"{BASE_URL}/events", json=event_data, headers=HEADERS)
+    return response.json()['result']['id']
+
+
+def create_event_with_data(name, description="測試活動", students=None, prizes=DEFAULT_PRIZES):
+    """創建測試活動並加入參與者（預設 10 位測試學生）與獎項（預設頭獎 1 名、二獎 2 名）"""
+    event_id = create_event(name, description)
+    students = make_students(10) if students is None else students
+    requests.post(f"{BASE_URL}/events/{event_id}/participants", json={"students": students}, headers=HEADERS)
+    if prizes:
+        requests.post(f"{BASE_URL}/events/{event_id}/prizes", json={"prizes": prizes}, headers=HEADERS)
+    return event_id
@@ -0,0 +1,23 @@
+-- Ranked alternate (backup) winners per prize, drawn in the same pass as the winners
+CREATE TABLE IF NOT EXISTS lottery_alternates (
+    id SERIAL PRIMARY KEY,
+    event_id VARCHAR NOT NULL REFERENCES lottery_events(id) ON DELETE CASCADE,
+    prize_id INTEGER NOT NULL REFERENCES lottery_prizes(id) ON DELETE CASCADE,
+    participant_id INTEGER NOT NULL REFERENCES lottery_participants(id) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,  -- 1 = first to be promoted
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (prize_id, rank),
+    UNIQUE (event_id, participant_id)  -- A participant is an alternate for at most one prize per event
+);
+
+-- The unique (prize_id, rank) index serves "next alternate of this prize" lookups
+CREATE INDEX IF NOT EXISTS idx_lottery_alternates_event_id ON lottery_alternates(event_id);
+
+-- Audit: number of alternates drawn per prize, after the winners in drawing order
+ALTER TABLE lottery_draw_audits ADD COLUMN IF NOT EXISTS alternate_counts INTEGER[];
+
+-- Verify the changes
+SELECT table_name, column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'lottery_alternates'
+ORDER BY ordinal_position;
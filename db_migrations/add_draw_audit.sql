@@ -0,0 +1,31 @@
+-- Seed and pool snapshot hash of the latest draw, stored on the event
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT FROM information_schema.columns
+        WHERE table_name = 'lottery_events' AND column_name = 'draw_seed'
+    ) THEN
+        ALTER TABLE lottery_events ADD COLUMN draw_seed VARCHAR(255);
+        ALTER TABLE lottery_events ADD COLUMN draw_pool_hash VARCHAR(64);
+    END IF;
+END $$;
+
+-- Audit log of every draw: everything needed to replay and verify it offline
+CREATE TABLE IF NOT EXISTS lottery_draw_audits (
+    id SERIAL PRIMARY KEY,
+    event_id VARCHAR NOT NULL REFERENCES lottery_events(id) ON DELETE CASCADE,
+    seed VARCHAR(255) NOT NULL,
+    algorithm VARCHAR(255) NOT NULL,
+    numpy_version VARCHAR(50) NOT NULL,
+    pool_hash VARCHAR(64) NOT NULL,
+    pool_snapshot BYTEA NOT NULL,          -- sorted participant IDs, little-endian int64
+    prize_ids INTEGER[] NOT NULL,          -- in drawing order
+    quantities INTEGER[] NOT NULL,
+    winner_ids INTEGER[] NOT NULL,         -- drawn participant IDs, in drawing order
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_lottery_draw_audits_event_id ON lottery_draw_audits(event_id, id DESC);
+
+-- Verify the changes
+SELECT id, name, status, draw_seed, draw_pool_hash FROM lottery_events LIMIT 5;
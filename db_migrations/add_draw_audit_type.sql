@@ -0,0 +1,5 @@
+-- Kind of draw an audit record belongs to: 'draw' for a full draw, 'redraw' for a partial re-draw of some prizes
+ALTER TABLE lottery_draw_audits ADD COLUMN IF NOT EXISTS draw_type VARCHAR(20) NOT NULL DEFAULT 'draw';
+
+-- Verify the changes
+SELECT id, event_id, draw_type, created_at FROM lottery_draw_audits ORDER BY id DESC LIMIT 5;
@@ -0,0 +1,18 @@
+-- Per-event draw weight: which participant data gives more chances in the draw
+-- ('uniform', 'completed_surveys' or 'completion_ratio')
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT FROM information_schema.columns
+        WHERE table_name = 'lottery_events' AND column_name = 'draw_weight'
+    ) THEN
+        ALTER TABLE lottery_events ADD COLUMN draw_weight VARCHAR(50) NOT NULL DEFAULT 'uniform';
+    END IF;
+END $$;
+
+-- Weights used by a weighted draw, needed to replay it
+ALTER TABLE lottery_draw_audits ADD COLUMN IF NOT EXISTS draw_weight VARCHAR(50) NOT NULL DEFAULT 'uniform';
+ALTER TABLE lottery_draw_audits ADD COLUMN IF NOT EXISTS weights_snapshot BYTEA;  -- little-endian float64, aligned with pool_snapshot
+
+-- Verify the changes
+SELECT id, name, type, draw_weight FROM lottery_events LIMIT 5;
@@ -0,0 +1,11 @@
+-- Partial indexes for keyset pagination of the (non-deleted) event list on (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_lottery_events_active_created_at
+    ON lottery_events (created_at DESC, id DESC)
+    WHERE is_deleted = FALSE;
+
+CREATE INDEX IF NOT EXISTS idx_lottery_events_active_type_created_at
+    ON lottery_events (type, created_at DESC, id DESC)
+    WHERE is_deleted = FALSE;
+
+-- Verify the changes
+SELECT indexname FROM pg_indexes WHERE tablename = 'lottery_events';
@@ -0,0 +1,18 @@
+-- Per-event version counter, bumped by every mutation of an event, its participants, prizes or winners.
+-- Read endpoints derive their ETag from it, so a conditional GET is answered with 304 after one lookup.
+CREATE TABLE IF NOT EXISTS lottery_event_versions (
+    event_id VARCHAR PRIMARY KEY REFERENCES lottery_events(id) ON DELETE CASCADE,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Existing events start at version 1
+INSERT INTO lottery_event_versions (event_id, version)
+SELECT id, 1 FROM lottery_events
+ON CONFLICT (event_id) DO NOTHING;
+
+-- Verify the changes
+SELECT table_name, column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'lottery_event_versions'
+ORDER BY ordinal_position;
@@ -0,0 +1,18 @@
+-- Stored responses of POST requests sent with an Idempotency-Key header, replayed to retries until they expire
+CREATE TABLE IF NOT EXISTS lottery_idempotency_keys (
+    idempotency_key VARCHAR(255) PRIMARY KEY,
+    fingerprint CHAR(64) NOT NULL,  -- SHA-256 of the method, path and body of the first request
+    status_code INTEGER NOT NULL,
+    response_body BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+-- Expired keys are purged by expires_at whenever a new response is stored
+CREATE INDEX IF NOT EXISTS idx_lottery_idempotency_keys_expires_at ON lottery_idempotency_keys(expires_at);
+
+-- Verify the changes
+SELECT table_name, column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'lottery_idempotency_keys'
+ORDER BY ordinal_position;
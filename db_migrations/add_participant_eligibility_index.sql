@@ -0,0 +1,17 @@
+-- Partial index over participants that have a display name, i.e. the rows that can be eligible for drawing.
+-- The predicate must stay identical to _DISPLAY_NAME_SQL / _ELIGIBLE_CONDITION_SQL in lottery_dao.py
+-- so the planner can match it for the draw pool query. Names are trimmed of every Unicode whitespace
+-- character (_WHITESPACE_SQL), like str.strip() in Python; the index is recreated for databases that have
+-- the earlier btrim(...) predicate, which only trimmed ASCII spaces.
+DROP INDEX IF EXISTS idx_lottery_participants_eligible;
+CREATE INDEX idx_lottery_participants_eligible
+    ON lottery_participants (event_id, id)
+    WHERE btrim(COALESCE(NULLIF(meta->'oracle_info'->>'name', ''),
+                         NULLIF(meta->'oracle_info'->>'chinese_name', ''),
+                         NULLIF(meta->'oracle_info'->>'english_name', ''),
+                         meta->'student_info'->>'name',
+                         ''),
+                E'\u0009\u000a\u000b\u000c\u000d\u001c\u001d\u001e\u001f\u0020\u0085\u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000') <> '';
+
+-- Verify the changes
+SELECT indexname FROM pg_indexes WHERE tablename = 'lottery_participants';
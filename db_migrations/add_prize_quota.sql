@@ -0,0 +1,10 @@
+-- Per-prize quota constraints, e.g. {"field": "department", "min_per_group": 1} or {"field": "grade", "max_ratio": 0.1}
+ALTER TABLE lottery_prizes ADD COLUMN IF NOT EXISTS quota JSONB;
+
+-- Quotas and group codes of a quota draw, needed to replay it
+ALTER TABLE lottery_draw_audits ADD COLUMN IF NOT EXISTS quotas JSONB;                -- per prize, in drawing order
+ALTER TABLE lottery_draw_audits ADD COLUMN IF NOT EXISTS department_snapshot BYTEA;  -- little-endian int32 group codes
+ALTER TABLE lottery_draw_audits ADD COLUMN IF NOT EXISTS grade_snapshot BYTEA;       -- little-endian int32 group codes
+
+-- Verify the changes
+SELECT id, event_id, name, quantity, quota FROM lottery_prizes LIMIT 5;
@@ -0,0 +1,13 @@
+-- Round-based draws: which prizes are done, and in which named round
+-- Events being drawn in rounds have status 'in_progress' until every prize is drawn
+ALTER TABLE lottery_prizes ADD COLUMN IF NOT EXISTS drawn_at TIMESTAMP;
+ALTER TABLE lottery_prizes ADD COLUMN IF NOT EXISTS round_name VARCHAR(255);
+
+-- Prizes of events that were already drawn count as done
+UPDATE lottery_prizes pr
+SET drawn_at = COALESCE((SELECT MIN(w.created_at) FROM lottery_winners w WHERE w.prize_id = pr.id), e.created_at)
+FROM lottery_events e
+WHERE e.id = pr.event_id AND e.status = 'drawn' AND pr.drawn_at IS NULL;
+
+-- Verify the changes
+SELECT id, event_id, name, quantity, drawn_at, round_name FROM lottery_prizes LIMIT 5;
@@ -0,0 +1,23 @@
+-- Opt-in scheduled draws: events with auto_draw are drawn automatically at their event_date
+ALTER TABLE lottery_events ADD COLUMN IF NOT EXISTS auto_draw BOOLEAN NOT NULL DEFAULT FALSE;
+
+-- Serves the scheduler's "due events" lookup
+CREATE INDEX IF NOT EXISTS idx_lottery_events_auto_draw_due ON lottery_events(event_date)
+    WHERE auto_draw = TRUE AND status = 'pending' AND is_deleted = FALSE;
+
+-- One lease per scheduled draw, so only one node fires it
+CREATE TABLE IF NOT EXISTS lottery_draw_leases (
+    event_id VARCHAR PRIMARY KEY REFERENCES lottery_events(id) ON DELETE CASCADE,
+    owner VARCHAR(255) NOT NULL,  -- host:pid of the scheduler that holds (or last held) the lease
+    leased_until TIMESTAMP NOT NULL,  -- the lease can be taken over after this (also the retry time after a failure)
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    drawn_at TIMESTAMP,  -- set once the scheduled draw succeeded; the event is never drawn by the scheduler again
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Verify the changes
+SELECT table_name, column_name, data_type
+FROM information_schema.columns
+WHERE (table_name = 'lottery_events' AND column_name = 'auto_draw') OR table_name = 'lottery_draw_leases'
+ORDER BY table_name, ordinal_position;
@@ -0,0 +1,15 @@
+-- Serialized, masked and grouped winners document of each drawn event, written when a draw commits
+-- and served as-is (with its ETag) by GET /events/{event_id}/winners.
+-- Writes that change the winners, prizes or participants of an event delete its row; the next read rebuilds it.
+CREATE TABLE IF NOT EXISTS lottery_winner_snapshots (
+    event_id VARCHAR PRIMARY KEY REFERENCES lottery_events(id) ON DELETE CASCADE,
+    document BYTEA NOT NULL,  -- the JSON response body
+    etag CHAR(64) NOT NULL,  -- SHA-256 of the document
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Verify the changes
+SELECT table_name, column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'lottery_winner_snapshots'
+ORDER BY ordinal_position;
@@ -0,0 +1,16 @@
+-- Term and student ID denormalized onto winners, so term-wide draws can exclude students
+-- who already won any event of the same term with an index lookup instead of scanning meta
+ALTER TABLE lottery_winners ADD COLUMN IF NOT EXISTS academic_year_term VARCHAR(255);
+ALTER TABLE lottery_winners ADD COLUMN IF NOT EXISTS student_id VARCHAR(255);
+
+-- Backfill existing winners
+UPDATE lottery_winners w
+SET academic_year_term = e.academic_year_term,
+    student_id = p.meta->'student_info'->>'id'
+FROM lottery_events e, lottery_participants p
+WHERE e.id = w.event_id AND p.id = w.participant_id AND w.academic_year_term IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_lottery_winners_term_student ON lottery_winners(academic_year_term, student_id);
+
+-- Verify the changes
+SELECT id, event_id, participant_id, academic_year_term, student_id FROM lottery_winners LIMIT 5;
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import socket
+from typing import List, Optional
+
+from lottery_api.business_model.lottery_business import LotteryBusiness
+from lottery_api.config import get_settings
+from lottery_api.data_access_object.db import Database
+from lottery_api.data_access_object.lottery_dao import LotteryDAO
+from lottery_api.lib.base_exception import HyException
+from lottery_api.lib.logger import get_prefix_logger_adapter
+
+logger = get_prefix_logger_adapter(__name__)
+
+
+class DrawScheduler:
+    """In-process scheduler that draws auto_draw events at their event_date (enabled by draw_scheduler_enabled)
+
+    Every node may run it: due events are leased in Postgres (lottery_draw_leases), so each draw fires on one node
+    only, and a lease left by a crashed node is taken over once it runs out. Each poll leases at most
+    draw_scheduler_concurrency events and draws them on pooled connections, so a cluster of ceremonies at the same
+    hour is worked off a few at a time (and shared between nodes) instead of starving API traffic.
+    A failed draw (e.g. no participants yet) is retried after draw_scheduler_retry_seconds, up to
+    draw_scheduler_max_attempts times.
+    """
+
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def run_once(cls) -> List[str]:
+        """Lease and draw the due events once; returns the IDs of the leased events"""
+        settings = get_settings()
+        db_pool = await Database.get_pool()
+        async with db_pool.acquire() as conn:
+            leased = await LotteryDAO.claim_due_draws(conn, cls.owner, settings.draw_scheduler_lease_seconds,
+                                                      settings.draw_scheduler_concurrency,
+                                                      settings.draw_scheduler_max_attempts)
+        await asyncio.gather(*(cls._draw(db_pool, lease['event_id'], lease['attempts']) for lease in leased))
+        return [lease['event_id'] for lease in leased]
+
+    @classmethod
+    async def _draw(cls, db_pool, event_id, attempt):
+        settings = get_settings()
+        async with db_pool.acquire() as conn:
+            try:
+                await LotteryBusiness.draw_winners(conn, event_id)
+            except Exception as e:
+                message = e.message if isinstance(e, HyException) else str(e)
+                logger.warning(f"Scheduled draw of lottery event {event_id} failed (attempt {attempt}): {message}")
+                await LotteryDAO.finish_draw_lease(conn, event_id, cls.owner, error=message,
+                                                   retry_seconds=settings.draw_scheduler_retry_seconds)
+            else:
+                logger.info(f"Scheduled draw of lottery event {event_id} completed")
+                await LotteryDAO.finish_draw_lease(conn, event_id, cls.owner)
+
+    @classmethod
+    async def _run(cls):
+        settings = get_settings()
+        logger.info(f"Draw scheduler started as {cls.owner}")
+        while True:
+            try:
+                leased = await cls.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Draw scheduler poll failed: {e}")
+                leased = []
+            # A full batch means more events may be due: go on right away, otherwise wait for the next poll
+            if len(leased) < settings.draw_scheduler_concurrency:
+                await asyncio.sleep(settings.draw_scheduler_poll_seconds)
+
+    @classmethod
+    def start(cls):
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.get_running_loop().create_task(cls._run())
+
+    @classmethod
+    async def stop(cls):
+        if cls._task is not None:
+            cls._task.cancel()
+            await asyncio.gather(cls._task, return_exceptions=True)
+            cls._task = None
@@ -1,12 +1,26 @@
-import random
+import asyncio
+import hashlib
 import pandas as pd
+import numpy as np
 import os
+import json
+import secrets
 from datetime import datetime
 from typing import Dict, List, Any
 
-from lottery_api.data_access_object.lottery_dao import LotteryDAO
-from lottery_api.lib.base_exception import ResourceNotFoundException, ParameterViolationException
+from lottery_api.business_model.results_bundle import ResultsBundle
+from lottery_api.config import get_settings
+from lottery_api.data_access_object.db import Database
+from lottery_api.data_access_object.event_lock import EventLock
+from lottery_api.data_access_object.lottery_dao import LotteryDAO, round_pool_cache, winner_index_cache
+from lottery_api.lib.base_exception import HyException, ResourceNotFoundException, ParameterViolationException, \
+    UnhandledException
+from lottery_api.lib.logger import get_prefix_logger_adapter
+from lottery_api.lib.response import ListResponse, json_dumps
 from lottery_api.schema.lottery import ValidSurveys, SurveysCompleted, StudentType
+from lottery_api.utils.draw_engine import DrawPool, QuotaInfeasibleError, replay_draw, rng_from_seed
+
+logger = get_prefix_logger_adapter(__name__)
 
 
 class LotteryBusiness:
@@ -21,32 +35,74 @@ class LotteryBusiness:
             name=event_data.name,
             description=event_data.description,
             event_date=event_data.event_date,
-            type=event_data.type.value
+            type=event_data.type.value,
+            draw_weight=event_data.draw_weight.value,
+            auto_draw=event_data.auto_draw
         )
         return result
 
     @staticmethod
-    async def get_lottery_events(conn, limit=100, offset=0, event_type=None):
-        """Get all lottery events with pagination"""
-        return await LotteryDAO.get_lottery_events(conn, limit, offset, event_type)
+    async def get_lottery_events(conn, limit=100, offset=0, event_type=None, include_counts=False,
+                                 after_created_at=None, after_id=None):
+        """Get all lottery events with pagination, optionally with participant/prize/winner counts"""
+        LotteryBusiness._check_keyset_cursor(after_created_at, after_id)
+        events = await LotteryDAO.get_lottery_events(conn, limit, offset, event_type, after_created_at, after_id)
+
+        if include_counts and events:
+            counts = await LotteryDAO.get_event_counts(conn, [event['id'] for event in events])
+            for event in events:
+                event.update(counts.get(event['id'], {}))
+
+        return events
+
+    @staticmethod
+    def _check_keyset_cursor(after_created_at, after_id):
+        """Reject a keyset cursor with only one of its two fields, which would silently fall back to offset paging"""
+        if (after_created_at is None) != (after_id is None):
+            raise ParameterViolationException(
+                message="after_created_at and after_id must be given together for keyset pagination"
+            )
+
+    @staticmethod
+    async def get_event_version(conn, event_id):
+        """Get the version of a lottery event, bumped by every change of the event and its data"""
+        version = await LotteryDAO.get_event_version(conn, event_id)
+        if version is None:
+            raise ResourceNotFoundException(message=f"Lottery event with ID {event_id} not found")
+        return version
+
+    @staticmethod
+    async def get_events_version(conn):
+        """Get the version of the whole event list"""
+        return await LotteryDAO.get_events_version(conn)
 
     @staticmethod
     async def get_lottery_event(conn, event_id):
         """Get a lottery event by ID"""
         event = await LotteryDAO.get_lottery_event_by_id(conn, event_id)
         if not event:
-            raise ResourceNotFoundException(f"Lottery event with ID {event_id} not found")
+            raise ResourceNotFoundException(message=f"Lottery event with ID {event_id} not found")
         return event
 
+    @staticmethod
+    async def get_event_summary(conn, event_id):
+        """Get a lottery event with prizes and participant/eligible/winner counts"""
+        summary = await LotteryDAO.get_event_summary(conn, event_id)
+        if not summary:
+            raise ResourceNotFoundException(message=f"Lottery event with ID {event_id} not found")
+        return summary
+
     @staticmethod
     async def update_lottery_event(conn, event_id, event_data):
         """Update a lottery event"""
         # First check if event exists
         existing_event = await LotteryBusiness.get_lottery_event(conn, event_id)
         
-        # Check if event has been drawn (prevent modification of drawn events)
+        # Check if event has been drawn or is being drawn in rounds (prevent modification of drawn events)
         if existing_event['status'] == 'drawn':
-            raise ParameterViolationException("Cannot update a lottery event that has already been drawn")
+            raise ParameterViolationException(message="Cannot update a lottery event that has already been drawn")
+        if existing_event['status'] == 'in_progress':
+            raise ParameterViolationException(message="Cannot update a lottery event that is being drawn")
         
         # Prepare update data, converting enum to value if needed
         update_data = {}
@@ -60,6 +116,10 @@ class LotteryBusiness:
             update_data['event_date'] = event_data.event_date
         if event_data.type is not None:
             update_data['type'] = event_data.type.value
+        if event_data.draw_weight is not None:
+            update_data['draw_weight'] = event_data.draw_weight.value
+        if event_data.auto_draw is not None:
+            update_data['auto_draw'] = event_data.auto_draw
         
         # Perform update
         result = await LotteryDAO.update_lottery_event(conn, event_id, **update_data)
@@ -114,7 +174,10 @@ class LotteryBusiness:
         
         # Use batch processing for better performance
         if filtered_students:
-            result = await LotteryDAO.add_participants_batch(conn, event_id, filtered_students, event['type'])
+            async with EventLock.hold(conn, event_id):
+                result = await LotteryDAO.add_participants_batch(conn, event_id, filtered_students, event['type'])
+                if result["updated_count"]:
+                    await LotteryBusiness._refresh_results_bundle(conn, event_id)
             
             # Combine results
             all_imported = []
@@ -169,6 +232,32 @@ class LotteryBusiness:
             "participants": participants
         }
 
+    @staticmethod
+    async def stream_participants(conn, event_id):
+        """Check the event and return an async iterator of NDJSON chunks with all of its participants"""
+        await LotteryBusiness.get_lottery_event(conn, event_id)
+        return LotteryBusiness._participants_ndjson(event_id)
+
+    @staticmethod
+    async def _participants_ndjson(event_id):
+        """Read the participants through a server-side cursor and yield one chunk of NDJSON lines per batch
+
+        The stream outlives the request's connection, so it reads on its own pooled connection. Only one batch
+        is in memory at a time, whatever the size of the event.
+        """
+        prefetch = get_settings().participant_stream_prefetch
+        db_pool = await Database.get_pool()
+        async with db_pool.acquire() as conn:
+            async with conn.transaction(readonly=True):
+                lines = []
+                async for participant in LotteryDAO.iter_participants(conn, event_id, prefetch):
+                    lines.append(json_dumps(participant))
+                    if len(lines) >= prefetch:
+                        yield b"\n".join(lines) + b"\n"
+                        lines = []
+                if lines:
+                    yield b"\n".join(lines) + b"\n"
+
     @staticmethod
     async def set_prizes(conn, event_id, prizes_data):
         """Set prizes for a lottery event"""
@@ -189,10 +278,13 @@ class LotteryBusiness:
                 conn,
                 event_id=event_id,
                 name=prize_data.name,
-                quantity=prize_data.quantity
+                quantity=prize_data.quantity,
+                quota=prize_data.quota.model_dump(mode='json') if prize_data.quota else None
             )
             results.append(result)
-        
+
+        if existing_prizes:
+            await LotteryBusiness._refresh_results_bundle(conn, event_id)
         return results
 
     @staticmethod
@@ -210,9 +302,13 @@ class LotteryBusiness:
         name = prize_data.name if prize_data.name is not None else ""
         quantity = prize_data.quantity if prize_data.quantity is not None else 0
         
-        result = await LotteryDAO.update_prize(conn, prize_id, name, quantity)
+        quota = prize_data.quota.model_dump(mode='json') if prize_data.quota else None
+        
+        result = await LotteryDAO.update_prize(conn, prize_id, name, quantity, quota,
+                                               update_quota='quota' in prize_data.model_fields_set)
         if not result:
             raise ResourceNotFoundException(f"Prize with ID {prize_id} not found")
+        await LotteryBusiness._refresh_results_bundle(conn, result['event_id'])
         return result
 
     @staticmethod
@@ -221,92 +317,646 @@ class LotteryBusiness:
         result = await LotteryDAO.delete_prize(conn, prize_id)
         if not result:
             raise ResourceNotFoundException(f"Prize with ID {prize_id} not found")
-        return {"id": result}
+        await LotteryBusiness._refresh_results_bundle(conn, result['event_id'])
+        return {"id": result['id']}
 
     @staticmethod
-    async def draw_winners(conn, event_id):
-        """Draw winners for a lottery event"""
-        # Check if event exists
-        event = await LotteryBusiness.get_lottery_event(conn, event_id)
+    async def draw_winners(conn, event_id, options=None):
+        """Draw winners for a lottery event
+
+        Every draw is seeded (with options.seed, or a generated seed) and its pool snapshot is audited,
+        so the draw can be replayed and verified later.
+        """
+        async with EventLock.hold(conn, event_id):
+            # Check if event exists
+            event = await LotteryBusiness.get_lottery_event(conn, event_id)
+        
+            # Check that the event is pending, has no winners yet and has prizes
+            prizes = await LotteryDAO.get_prizes(conn, event_id)
+            LotteryBusiness._check_drawable(event, await LotteryDAO.has_winners(conn, event_id), prizes)
         
+            # Get the compact pool of eligible participant IDs who haven't won yet,
+            # with the department/grade group codes the prize quotas need
+            term_exclusive = options.term_exclusive if options is not None else False
+            pool = await LotteryDAO.get_eligible_pool(conn, event_id, event['draw_weight'],
+                                                      LotteryBusiness._quota_fields(prizes), term_exclusive)
+        
+            seed = options.seed if options is not None and options.seed else secrets.token_hex(16)
+            alternates_per_prize = options.alternates_per_prize if options is not None else 0
+            return await LotteryBusiness._draw_event(conn, event, prizes, pool, seed, alternates_per_prize)
+
+    @staticmethod
+    def _check_drawable(event, has_winners, prizes):
+        """Reject events that cannot be drawn: not pending, already drawn or without prizes"""
         # Check if the event is in pending status
         if event['status'] != 'pending':
-            raise ParameterViolationException("This lottery event is not in pending status. Only pending events can be drawn.")
+            raise ParameterViolationException(message="This lottery event is not in pending status. Only pending events can be drawn.")
         
         # Check if the event already has winners
-        has_winners = await LotteryDAO.has_winners(conn, event_id)
         if has_winners:
-            raise ParameterViolationException("This lottery event has already been drawn. Cannot draw again.")
+            raise ParameterViolationException(message="This lottery event has already been drawn. Cannot draw again.")
         
-        # Get all prizes
-        prizes = await LotteryDAO.get_prizes(conn, event_id)
         if not prizes:
-            raise ParameterViolationException("No prizes defined for this lottery event")
-        
-        # Get participants who haven't won yet
-        participants = await LotteryDAO.get_non_winners(conn, event_id)
-        if not participants:
-            raise ParameterViolationException("No participants available for drawing")
+            raise ParameterViolationException(message="No prizes defined for this lottery event")
+
+    @staticmethod
+    def _quota_fields(prizes):
+        """The group fields (department / grade) the quotas of the given prizes need in the pool"""
+        return sorted({prize['quota']['field'] for prize in prizes if prize['quota']})
+
+    @staticmethod
+    async def _draw_event(conn, event, prizes, pool, seed, alternates_per_prize=0):
+        """Draw every prize of a checked event from its pool, save the results and return the winners by prize"""
+        if not len(pool):
+            raise ParameterViolationException(message="No participants available for drawing")
         
-        # Draw winners for each prize
+        # One seeded sample over the pool, sliced across prizes in prize order.
+        # Alternates come from the same sample, after the winners of every prize.
+        quotas = [prize['quota'] for prize in prizes]
+        quantities = [prize['quantity'] for prize in prizes]
+        alternate_counts = [alternates_per_prize] * len(prizes) if alternates_per_prize else []
+        drawn_slices = LotteryBusiness._draw_slices(pool, prizes, quantities, quotas, seed, alternate_counts)
+        prize_slices = drawn_slices[:len(prizes)]
+        alternate_slices = drawn_slices[len(prizes):] or [[] for _ in prizes]
+        pool_hash = pool.snapshot_hash()
+
+        # Save all winners and alternates, flip the event status to 'drawn' and record the audit in one transaction
+        event_id = event['id']
+        prize_ids = [prize['id'] for prize, selected in zip(prizes, prize_slices) for _ in selected]
+        participant_ids = [participant_id for selected in prize_slices for participant_id in selected]
+        async with conn.transaction():
+            saved_winners = await LotteryDAO.save_draw_results(conn, event_id, prize_ids, participant_ids,
+                                                               draw_seed=seed, draw_pool_hash=pool_hash)
+            if alternate_counts:
+                await LotteryDAO.save_alternates(
+                    conn, event_id,
+                    [prize['id'] for prize, selected in zip(prizes, alternate_slices) for _ in selected],
+                    [participant_id for selected in alternate_slices for participant_id in selected],
+                    [rank for selected in alternate_slices for rank in range(1, len(selected) + 1)]
+                )
+            await LotteryBusiness._save_draw_audit(conn, event, seed, pool, prizes, quantities, quotas,
+                                                   drawn_slices, alternate_counts)
+            await LotteryBusiness._save_winners_snapshot(conn, event_id)
+        await LotteryBusiness._refresh_results_bundle(conn, event_id)
+        winner_ids = {row['participant_id']: row['id'] for row in saved_winners}
+
+        # Only the selected winners and alternates are loaded and masked for the response
+        participants_by_id = await LotteryDAO.get_draw_participants(
+            conn, [participant_id for selected in drawn_slices for participant_id in selected]
+        )
+
         winners_by_prize = []
-        for prize in prizes:
-            prize_winners = []
-            quantity = min(prize['quantity'], len(participants))
-            
-            # Randomly select winners
-            selected_winners = random.sample(participants, quantity)
-            
-            # Remove selected winners from participants pool to avoid duplicates
-            participant_ids = [p['participant_id'] for p in selected_winners]
-            participants = [p for p in participants if p['participant_id'] not in participant_ids]
-            
-            # Save winners to database
-            for winner in selected_winners:
-                result = await LotteryDAO.save_winner(conn, event_id, prize['id'], winner['participant_id'])
-                prize_winners.append({**winner, 'winner_id': result['id']})
-            
+        for prize, selected, alternates in zip(prizes, prize_slices, alternate_slices):
             winners_by_prize.append({
                 "prize_name": prize['name'],
                 "quantity": prize['quantity'],
-                "winners": prize_winners
+                "winners": [{**participants_by_id[participant_id], 'winner_id': winner_ids[participant_id]}
+                            for participant_id in selected],
+                "alternates": [{**participants_by_id[participant_id], 'rank': rank}
+                               for rank, participant_id in enumerate(alternates, start=1)]
             })
         
-        # Update event status to 'drawn'
-        await LotteryDAO.update_event_status(conn, event_id, "drawn")
-        
         return winners_by_prize
 
+    @staticmethod
+    async def draw_events(conn, request):
+        """Draw many pending events at once
+
+        Every event is locked first, on the request connection, so nothing changes between the set-based loads and
+        the draws; events locked by another request fail right away. Events, prizes and pools are loaded with one
+        set-based query each, then the events are drawn concurrently (at most batch_draw_concurrency at a time),
+        each on its own pooled connection and in its own transaction, so one failing event doesn't affect the others.
+        With term_exclusive, events of the same term are drawn one after another and every event after the first
+        reloads its pool, so a student can't win two events of the term within the batch either.
+
+        Returns:
+            One result per requested event, in request order, with its winners or its error
+        """
+        event_ids = list(dict.fromkeys(request.event_ids))
+        locked = await EventLock.try_acquire_many(conn, event_ids)
+        try:
+            results = await LotteryBusiness._draw_locked_events(conn, request, locked)
+        finally:
+            await EventLock.release_many(conn, locked)
+
+        return [
+            results.get(event_id) or LotteryBusiness._batch_error(event_id, EventLock.busy_error(event_id))
+            for event_id in event_ids
+        ]
+
+    @staticmethod
+    def _batch_error(event_id, error):
+        return {"event_id": event_id, "success": False, "prizes": [],
+                "error": {"code": error.code, "message": error.message}}
+
+    @staticmethod
+    async def _draw_locked_events(conn, request, event_ids):
+        """Check, load and draw events whose locks the request connection holds; returns the results by event ID"""
+        events = await LotteryDAO.get_lottery_events_by_ids(conn, event_ids)
+        prizes_by_event = await LotteryDAO.get_prizes_by_event_ids(conn, event_ids)
+
+        results = {}
+        drawable = []
+        for event_id in event_ids:
+            event = events.get(event_id)
+            try:
+                if event is None:
+                    raise ResourceNotFoundException(message=f"Lottery event with ID {event_id} not found")
+                LotteryBusiness._check_drawable(event, event['has_winners'], prizes_by_event[event_id])
+                drawable.append(event)
+            except HyException as e:
+                results[event_id] = LotteryBusiness._batch_error(event_id, e)
+
+        pools = await LotteryDAO.get_eligible_pools(
+            conn, drawable, {event['id']: LotteryBusiness._quota_fields(prizes_by_event[event['id']]) for event in drawable},
+            request.term_exclusive
+        )
+
+        # Each chain of events is drawn in order; chains run concurrently
+        chains = {}
+        for event in drawable:
+            chains.setdefault(event['academic_year_term'] if request.term_exclusive else event['id'], []).append(event)
+
+        db_pool = await Database.get_pool()
+        semaphore = asyncio.Semaphore(get_settings().batch_draw_concurrency)
+
+        async def draw_chain(chain):
+            for index, event in enumerate(chain):
+                seed = f"{request.seed}:{event['id']}" if request.seed else secrets.token_hex(16)
+                prizes = prizes_by_event[event['id']]
+                async with semaphore, db_pool.acquire() as event_conn:
+                    try:
+                        pool = pools[event['id']] if index == 0 else await LotteryDAO.get_eligible_pool(
+                            event_conn, event['id'], event['draw_weight'], LotteryBusiness._quota_fields(prizes), True
+                        )
+                        winners_by_prize = await LotteryBusiness._draw_event(
+                            event_conn, event, prizes, pool, seed, request.alternates_per_prize
+                        )
+                        results[event['id']] = {"event_id": event['id'], "success": True,
+                                                "prizes": winners_by_prize, "error": None}
+                    except HyException as e:
+                        results[event['id']] = LotteryBusiness._batch_error(event['id'], e)
+                    except Exception:
+                        # The details stay in the log; the response only says the draw failed
+                        logger.exception(f"Batch draw of lottery event {event['id']} failed")
+                        results[event['id']] = LotteryBusiness._batch_error(
+                            event['id'], UnhandledException(message="Unexpected error while drawing the lottery event")
+                        )
+
+        await asyncio.gather(*(draw_chain(chain) for chain in chains.values()))
+        return results
+
+    @staticmethod
+    def _draw_slices(pool, prizes, quantities, quotas, seed, alternate_counts=()):
+        """Draw the winners (then the alternates) of the given prizes from the pool with a seeded generator
+
+        Quotas are checked while drawing, so infeasible quotas are rejected before anything is written.
+        """
+        alternate_counts = list(alternate_counts)
+        try:
+            return pool.draw_prize_slices(list(quantities) + alternate_counts, rng_from_seed(seed),
+                                          list(quotas) + [None] * len(alternate_counts))
+        except QuotaInfeasibleError as e:
+            raise ParameterViolationException(
+                message=f"Quota of prize '{prizes[e.prize_index]['name']}' cannot be met: {e}"
+            )
+
+    @staticmethod
+    async def _save_draw_audit(conn, event, seed, pool, prizes, quantities, quotas, drawn_slices,
+                               alternate_counts=(), draw_type="draw"):
+        """Record everything needed to replay a draw: seed, pool snapshot, prize plan and drawn IDs in order"""
+        await LotteryDAO.save_draw_audit(
+            conn, event['id'], seed, pool.algorithm(stratified=any(quotas)), np.__version__, pool.snapshot_hash(),
+            pool.snapshot_bytes(),
+            [prize['id'] for prize in prizes], quantities,
+            [participant_id for selected in drawn_slices for participant_id in selected],
+            draw_weight=event['draw_weight'], weights_snapshot=pool.weights_snapshot_bytes(),
+            quotas=quotas if any(quotas) else None,
+            department_snapshot=pool.group_snapshot_bytes('department'),
+            grade_snapshot=pool.group_snapshot_bytes('grade'),
+            alternate_counts=list(alternate_counts) or None,
+            draw_type=draw_type
+        )
+
+    @staticmethod
+    async def _get_requested_prizes(conn, event_id, prize_ids):
+        """Get the given prizes of an event, in request order without duplicates"""
+        prizes_by_id = {prize['id']: prize for prize in await LotteryDAO.get_prizes(conn, event_id)}
+        missing = [prize_id for prize_id in prize_ids if prize_id not in prizes_by_id]
+        if missing:
+            raise ResourceNotFoundException(message=f"Prizes {missing} not found in lottery event {event_id}")
+        return [prizes_by_id[prize_id] for prize_id in dict.fromkeys(prize_ids)]
+
+    @staticmethod
+    async def draw_round(conn, event_id, request):
+        """Draw one named round (a subset of the prizes) against the remaining pool
+
+        The pool left after a round (its winners and alternates excluded) is kept in memory with the event version
+        it belongs to, so the next round starts from it instead of reloading the pool; it is reloaded only after
+        another change to the event, or with term_exclusive. The event is 'in_progress' until every prize is drawn.
+        """
+        async with EventLock.hold(conn, event_id):
+            event = await LotteryBusiness.get_lottery_event(conn, event_id)
+            if event['status'] not in ('pending', 'in_progress'):
+                raise ParameterViolationException(message="All prizes of this lottery event have already been drawn")
+
+            prizes = await LotteryBusiness._get_requested_prizes(conn, event_id, request.prize_ids)
+            drawn = [prize['name'] for prize in prizes if prize['drawn_at'] is not None]
+            if drawn:
+                raise ParameterViolationException(message=f"Prizes already drawn: {', '.join(drawn)}")
+
+            quotas = [prize['quota'] for prize in prizes]
+            group_fields = sorted({quota['field'] for quota in quotas if quota})
+            pool = await LotteryBusiness._get_round_pool(conn, event, group_fields, request.term_exclusive)
+            if not len(pool):
+                raise ParameterViolationException(message="No participants available for drawing")
+
+            seed = request.seed or secrets.token_hex(16)
+            quantities = [prize['quantity'] for prize in prizes]
+            alternate_counts = [request.alternates_per_prize] * len(prizes) if request.alternates_per_prize else []
+            drawn_slices = LotteryBusiness._draw_slices(pool, prizes, quantities, quotas, seed, alternate_counts)
+            prize_slices = drawn_slices[:len(prizes)]
+            alternate_slices = drawn_slices[len(prizes):] or [[] for _ in prizes]
+
+            async with conn.transaction():
+                saved_winners, status = await LotteryDAO.save_round_results(
+                    conn, event_id, request.round_name, [prize['id'] for prize in prizes],
+                    [prize['id'] for prize, selected in zip(prizes, prize_slices) for _ in selected],
+                    [participant_id for selected in prize_slices for participant_id in selected]
+                )
+                if alternate_counts:
+                    await LotteryDAO.save_alternates(
+                        conn, event_id,
+                        [prize['id'] for prize, selected in zip(prizes, alternate_slices) for _ in selected],
+                        [participant_id for selected in alternate_slices for participant_id in selected],
+                        [rank for selected in alternate_slices for rank in range(1, len(selected) + 1)]
+                    )
+                await LotteryBusiness._save_draw_audit(conn, event, seed, pool, prizes, quantities, quotas,
+                                                       drawn_slices, alternate_counts, draw_type="round")
+                await LotteryBusiness._save_winners_snapshot(conn, event_id)
+                version = await LotteryDAO.get_event_version(conn, event_id)
+            if status == 'in_progress' and not request.term_exclusive:
+                remaining_pool = pool.exclude([participant_id for selected in drawn_slices
+                                               for participant_id in selected])
+                round_pool_cache.set(event_id, (version, tuple(group_fields), remaining_pool))
+            await LotteryBusiness._refresh_results_bundle(conn, event_id)
+            winner_ids = {row['participant_id']: row['id'] for row in saved_winners}
+
+            participants_by_id = await LotteryDAO.get_draw_participants(
+                conn, [participant_id for selected in drawn_slices for participant_id in selected]
+            )
+            remaining = [prize['id'] for prize in await LotteryDAO.get_prizes(conn, event_id) if prize['drawn_at'] is None]
+            return {
+                "round_name": request.round_name,
+                "status": status,
+                "prizes": [{
+                    "prize_name": prize['name'],
+                    "quantity": prize['quantity'],
+                    "winners": [{**participants_by_id[participant_id], 'winner_id': winner_ids[participant_id]}
+                                for participant_id in selected],
+                    "alternates": [{**participants_by_id[participant_id], 'rank': rank}
+                                   for rank, participant_id in enumerate(alternates, start=1)]
+                } for prize, selected, alternates in zip(prizes, prize_slices, alternate_slices)],
+                "remaining_prize_ids": remaining
+            }
+
+    @staticmethod
+    async def _get_round_pool(conn, event, group_fields, term_exclusive):
+        """Get the pool of a round: the pool left by the previous round while the event is still at the version
+        that round left it at, loaded with get_eligible_pool otherwise (always with term_exclusive, whose pool also
+        depends on the winners of other events)"""
+        if not term_exclusive:
+            cached = round_pool_cache.get(event['id'])
+            if cached is not None:
+                version, fields, pool = cached
+                if fields == tuple(group_fields) and version == await LotteryDAO.get_event_version(conn, event['id']):
+                    return pool
+        return await LotteryDAO.get_eligible_pool(conn, event['id'], event['draw_weight'], group_fields,
+                                                  term_exclusive)
+
+    @staticmethod
+    async def get_rounds(conn, event_id):
+        """Get the drawn rounds of an event (in drawing order) and the prizes not drawn yet"""
+        event = await LotteryBusiness.get_lottery_event(conn, event_id)
+        prizes = await LotteryDAO.get_prizes(conn, event_id)
+        winner_counts = await LotteryDAO.get_prize_winner_counts(conn, event_id)
+
+        def round_prize(prize):
+            return {
+                "prize_id": prize['id'],
+                "prize_name": prize['name'],
+                "quantity": prize['quantity'],
+                "winner_count": winner_counts.get(prize['id'], 0)
+            }
+
+        rounds = {}
+        for prize in sorted((p for p in prizes if p['drawn_at'] is not None), key=lambda p: (p['drawn_at'], p['id'])):
+            # Prizes of one round share its drawn_at (the transaction timestamp); round names may repeat
+            draw_round = rounds.setdefault(prize['drawn_at'], {
+                "round_name": prize['round_name'],
+                "drawn_at": prize['drawn_at'],
+                "prizes": []
+            })
+            draw_round["prizes"].append(round_prize(prize))
+
+        return {
+            "event_id": event_id,
+            "status": event['status'],
+            "rounds": list(rounds.values()),
+            "remaining_prizes": [round_prize(prize) for prize in prizes if prize['drawn_at'] is None]
+        }
+
+    @staticmethod
+    async def redraw_prizes(conn, event_id, request):
+        """Re-draw a subset of prizes of a drawn event without touching the winners of the other prizes
+
+        The pool excludes every current winner and alternate, so the replaced winners can't win again.
+        With keep_existing only the vacant places of the prizes are filled.
+        """
+        async with EventLock.hold(conn, event_id):
+            event = await LotteryBusiness.get_lottery_event(conn, event_id)
+            if event['status'] not in ('drawn', 'in_progress'):
+                raise ParameterViolationException(message="Only drawn lottery events can be re-drawn")
+
+            prizes = await LotteryBusiness._get_requested_prizes(conn, event_id, request.prize_ids)
+            if any(prize['drawn_at'] is None for prize in prizes):
+                raise ParameterViolationException(message="Only prizes that have been drawn can be re-drawn")
+
+            if request.keep_existing:
+                if any(prize['quota'] for prize in prizes):
+                    raise ParameterViolationException(message="Prizes with a quota can only be re-drawn in full")
+                winner_counts = await LotteryDAO.get_prize_winner_counts(conn, event_id)
+                quantities = [max(prize['quantity'] - winner_counts.get(prize['id'], 0), 0) for prize in prizes]
+            else:
+                quantities = [prize['quantity'] for prize in prizes]
+
+            quotas = [prize['quota'] for prize in prizes]
+            group_fields = sorted({quota['field'] for quota in quotas if quota})
+            pool = await LotteryDAO.get_eligible_pool(conn, event_id, event['draw_weight'], group_fields,
+                                                      request.term_exclusive)
+            if not len(pool) and sum(quantities):
+                raise ParameterViolationException(message="No participants available for drawing")
+
+            seed = request.seed or secrets.token_hex(16)
+            prize_slices = LotteryBusiness._draw_slices(pool, prizes, quantities, quotas, seed)
+
+            # Replace the old winners of the prizes and insert the new ones in one statement
+            replaced_prize_ids = [] if request.keep_existing else [prize['id'] for prize in prizes]
+            participant_ids = [participant_id for selected in prize_slices for participant_id in selected]
+            async with conn.transaction():
+                saved_winners, replaced = await LotteryDAO.replace_prize_winners(
+                    conn, event_id, replaced_prize_ids,
+                    [prize['id'] for prize, selected in zip(prizes, prize_slices) for _ in selected],
+                    participant_ids
+                )
+                await LotteryBusiness._save_draw_audit(conn, event, seed, pool, prizes, quantities, quotas,
+                                                       prize_slices, draw_type="redraw")
+                await LotteryBusiness._save_winners_snapshot(conn, event_id)
+            await LotteryBusiness._refresh_results_bundle(conn, event_id)
+            winner_ids = {row['participant_id']: row['id'] for row in saved_winners}
+
+            participants_by_id = await LotteryDAO.get_draw_participants(conn, participant_ids)
+            return [{
+                "prize_id": prize['id'],
+                "prize_name": prize['name'],
+                "quantity": prize['quantity'],
+                "replaced_winners_count": replaced.get(prize['id'], 0),
+                "winners": [{**participants_by_id[participant_id], 'winner_id': winner_ids[participant_id]}
+                            for participant_id in selected]
+            } for prize, selected in zip(prizes, prize_slices)]
+
+    @staticmethod
+    async def get_alternates(conn, event_id):
+        """Get the remaining ranked alternates of an event, grouped by prize"""
+        await LotteryBusiness.get_lottery_event(conn, event_id)
+
+        prizes_map = {}
+        for alternate in await LotteryDAO.get_alternates(conn, event_id):
+            prize = prizes_map.setdefault(alternate['prize_id'], {
+                "prize_id": alternate['prize_id'],
+                "prize_name": alternate['prize_name'],
+                "alternates": []
+            })
+            prize["alternates"].append({k: v for k, v in alternate.items() if k not in ('prize_id', 'prize_name')})
+        return list(prizes_map.values())
+
+    @staticmethod
+    async def promote_alternate(conn, event_id, winner_id):
+        """Replace a winner (e.g. one who can't be reached) with the next ranked alternate of the same prize"""
+        await LotteryBusiness.get_lottery_event(conn, event_id)
+
+        async with EventLock.hold(conn, event_id):
+            async with conn.transaction():
+                promoted = await LotteryDAO.promote_alternate(conn, event_id, winner_id)
+                if promoted:
+                    await LotteryBusiness._save_winners_snapshot(conn, event_id)
+            if not promoted:
+                if not await LotteryDAO.winner_exists(conn, event_id, winner_id):
+                    raise ResourceNotFoundException(message=f"Winner {winner_id} not found in lottery event {event_id}")
+                raise ParameterViolationException(message="No alternates left for this prize")
+            await LotteryBusiness._refresh_results_bundle(conn, event_id)
+
+            participants_by_id = await LotteryDAO.get_draw_participants(conn, [promoted['participant_id']])
+            return {
+                "winner_id": promoted['id'],
+                "prize_id": promoted['prize_id'],
+                "alternate_rank": promoted['alternate_rank'],
+                "replaced_winner_id": promoted['replaced_winner_id'],
+                "replaced_participant_id": promoted['replaced_participant_id'],
+                "winner": participants_by_id[promoted['participant_id']]
+            }
+
+    @staticmethod
+    async def get_draw_audit(conn, event_id):
+        """Get the audit record of the latest draw and verify it by replaying the seeded draw"""
+        await LotteryBusiness.get_lottery_event(conn, event_id)
+
+        audit = await LotteryDAO.get_latest_draw_audit(conn, event_id)
+        if not audit:
+            raise ResourceNotFoundException(message=f"No draw audit found for lottery event {event_id}")
+
+        weights = None
+        if audit['weights_snapshot'] is not None:
+            weights = np.frombuffer(audit['weights_snapshot'], dtype='<f8')
+        groups = {field: np.frombuffer(audit[f'{field}_snapshot'], dtype='<i4')
+                  for field in ('department', 'grade') if audit[f'{field}_snapshot'] is not None}
+        quotas = json.loads(audit['quotas']) if audit['quotas'] else [None] * len(audit['prize_ids'])
+        alternate_counts = audit['alternate_counts'] or []
+        pool = DrawPool(np.frombuffer(audit['pool_snapshot'], dtype='<i8'), weights, groups)
+        replayed = replay_draw(pool.ids, audit['quantities'] + alternate_counts, audit['seed'], weights, groups,
+                               quotas + [None] * len(alternate_counts))
+        replayed_alternates = replayed[len(audit['prize_ids']):] or [[] for _ in audit['prize_ids']]
+        replayed = replayed[:len(audit['prize_ids'])]
+
+        prizes = []
+        start = 0
+        for prize_id, quantity, quota, expected in zip(audit['prize_ids'], audit['quantities'], quotas, replayed):
+            winner_ids = audit['winner_ids'][start:start + len(expected)]
+            start += len(expected)
+            prizes.append({"prize_id": prize_id, "quantity": quantity, "quota": quota, "winner_ids": winner_ids})
+        for prize, expected in zip(prizes, replayed_alternates):
+            prize["alternate_ids"] = audit['winner_ids'][start:start + len(expected)]
+            start += len(expected)
+
+        verified = (
+            pool.snapshot_hash() == audit['pool_hash']
+            and [p['winner_ids'] for p in prizes] == replayed
+            and [p['alternate_ids'] for p in prizes] == replayed_alternates
+            and start == len(audit['winner_ids'])
+        )
+        return {
+            "event_id": audit['event_id'],
+            "seed": audit['seed'],
+            "algorithm": audit['algorithm'],
+            "numpy_version": audit['numpy_version'],
+            "draw_type": audit['draw_type'],
+            "pool_hash": audit['pool_hash'],
+            "pool_size": len(pool),
+            "pool_ids": pool.ids.tolist(),
+            "draw_weight": audit['draw_weight'],
+            "weights": None if weights is None else weights.tolist(),
+            "groups": {field: codes.tolist() for field, codes in groups.items()} or None,
+            "prizes": prizes,
+            "verified": verified,
+            "created_at": audit['created_at']
+        }
+
     @staticmethod
     async def reset_drawing(conn, event_id):
         """Reset a lottery drawing by deleting all winners and setting status back to pending"""
-        # Check if event exists
-        event = await LotteryBusiness.get_lottery_event(conn, event_id)
+        async with EventLock.hold(conn, event_id):
+            # Check if event exists
+            event = await LotteryBusiness.get_lottery_event(conn, event_id)
         
-        # Check if the event has winners
-        has_winners = await LotteryDAO.has_winners(conn, event_id)
-        if not has_winners:
-            raise ParameterViolationException("This lottery event has no winners to delete.")
+            # Check if the event has winners
+            has_winners = await LotteryDAO.has_winners(conn, event_id)
+            if not has_winners:
+                raise ParameterViolationException(message="This lottery event has no winners to delete.")
         
-        # Delete all winners for this event
-        deleted_winners = await LotteryDAO.delete_winners(conn, event_id)
-        
-        # Update event status back to 'pending'
-        await LotteryDAO.update_event_status(conn, event_id, "pending")
+            async with conn.transaction():
+                # Delete all winners for this event
+                deleted_winners = await LotteryDAO.delete_winners(conn, event_id)
+            
+                # Update event status back to 'pending' and every prize back to not drawn;
+                # the audit log of the reset draw is kept
+                await LotteryDAO.update_event_status(conn, event_id, "pending")
+                await LotteryDAO.clear_draw_seed(conn, event_id)
+                await LotteryDAO.reset_prize_rounds(conn, event_id)
+            await LotteryBusiness._refresh_results_bundle(conn, event_id)
         
-        # Convert to dict to avoid serialization issues with asyncpg.Record
-        return {
-            "event_id": event_id,
-            "deleted_winners_count": len(deleted_winners),
-            "status": "pending"
-        }
+            # Convert to dict to avoid serialization issues with asyncpg.Record
+            return {
+                "event_id": event_id,
+                "deleted_winners_count": len(deleted_winners),
+                "status": "pending"
+            }
+
+    @staticmethod
+    async def get_scheduled_draws(conn, limit=100):
+        """Get the auto_draw events with the lease, attempts and last error of their scheduled draw"""
+        rows = await LotteryDAO.get_scheduled_draws(conn, limit)
+        return [{**row, 'attempts': row['attempts'] or 0} for row in rows]
 
     @staticmethod
     async def get_winners(conn, event_id):
         """Get winners for a lottery event"""
         # Check if event exists
         event = await LotteryBusiness.get_lottery_event(conn, event_id)
-        
+        return await LotteryBusiness._group_winners(conn, event_id)
+
+    @staticmethod
+    async def get_student_result(event_id, student_id):
+        """Look up whether a student won a lottery event, and which prize
+
+        Lookups are answered from an in-process index of the event's winning student IDs, so the hot path does
+        no database work. The index is loaded on the first lookup after a draw, reset or prize change (those
+        evict it on every worker through the InvalidationBus), and concurrent misses share a single query.
+        """
+        index = await LotteryBusiness._get_winner_index(event_id)
+        if index is None:
+            raise ResourceNotFoundException(message=f"Lottery event with ID {event_id} not found")
+
+        prize_name = index['winners'].get(student_id)
+        return {
+            "event_id": event_id,
+            "student_id": student_id,
+            "status": index['status'],
+            "won": prize_name is not None,
+            "prize_name": prize_name
+        }
+
+    @staticmethod
+    async def _get_winner_index(event_id):
+        """Get the cached winner index of an event, loading it once on a miss"""
+        # The loading task itself is cached: concurrent misses await the same task, and an invalidation
+        # that arrives while it runs drops it, so its (possibly stale) result is not served afterwards
+        task = winner_index_cache.get(event_id)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(LotteryBusiness._load_winner_index(event_id))
+            winner_index_cache.set(event_id, task)
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            winner_index_cache.invalidate(event_id)
+            raise
+
+    @staticmethod
+    async def _load_winner_index(event_id):
+        db_pool = await Database.get_pool()
+        async with db_pool.acquire() as conn:
+            return await LotteryDAO.get_winner_index(conn, event_id)
+
+    @staticmethod
+    async def get_winners_snapshot(conn, event_id):
+        """Get the serialized winners response of an event (document bytes and ETag)
+
+        The document is written when a draw commits, so reads skip the join, masking and grouping. Every change
+        to the event bumps its version and drops the document; it is then rebuilt here and stored again, but only
+        if the version read before the rebuild is still current, so a rebuild can't overwrite a newer change.
+        """
+        await LotteryBusiness.get_lottery_event(conn, event_id)
+
+        snapshot = await LotteryDAO.get_winners_snapshot(conn, event_id)
+        if snapshot is not None:
+            return snapshot
+
+        version = await LotteryDAO.get_event_version(conn, event_id)
+        snapshot = await LotteryBusiness._build_winners_snapshot(conn, event_id)
+        if version is not None:
+            await LotteryDAO.save_winners_snapshot(conn, event_id, snapshot['document'], snapshot['etag'], version)
+        return snapshot
+
+    @staticmethod
+    async def _refresh_results_bundle(conn, event_id):
+        """Rewrite the public results bundle of an event from its winners snapshot, or remove it when the event
+        has no winners; call it after the change has committed. A failed file write is logged, not raised."""
+        if not get_settings().results_bundle_enabled:
+            return
+        try:
+            if await LotteryDAO.has_winners(conn, event_id):
+                snapshot = await LotteryBusiness.get_winners_snapshot(conn, event_id)
+                await ResultsBundle.write(event_id, snapshot['document'])
+            else:
+                await ResultsBundle.remove(event_id)
+        except OSError as e:
+            logger.warning(f"Could not refresh the results bundle of lottery event {event_id}: {e}")
+
+    @staticmethod
+    async def _build_winners_snapshot(conn, event_id):
+        """Serialize the grouped winners of an event as the body of the winners response"""
+        document = json_dumps(ListResponse(result=await LotteryBusiness._group_winners(conn, event_id)))
+        return {"document": document, "etag": hashlib.sha256(document).hexdigest()}
+
+    @staticmethod
+    async def _save_winners_snapshot(conn, event_id):
+        """Build and store the winners document of an event (call it in the transaction that changed the winners)"""
+        snapshot = await LotteryBusiness._build_winners_snapshot(conn, event_id)
+        await LotteryDAO.save_winners_snapshot(conn, event_id, snapshot['document'], snapshot['etag'])
+        return snapshot
+
+    @staticmethod
+    async def _group_winners(conn, event_id):
+        """Get the masked winners of an event grouped by prize"""
         # Get all winners
         all_winners = await LotteryDAO.get_winners(conn, event_id)
         
@@ -395,48 +1045,50 @@ class LotteryBusiness:
         """, participant_id)
         
         if not participant:
-            raise ResourceNotFoundException(f"Participant with ID {participant_id} not found")
+            raise ResourceNotFoundException(message=f"Participant with ID {participant_id} not found")
         
         event_id = participant['event_id']
         
-        # Check if the event exists and get its status
-        event = await LotteryBusiness.get_lottery_event(conn, event_id)
+        async with EventLock.hold(conn, event_id):
+            # Check if the event exists and get its status
+            event = await LotteryBusiness.get_lottery_event(conn, event_id)
         
-        # Check if the event has been drawn (has winners)
-        has_winners = await LotteryDAO.has_winners(conn, event_id)
-        if has_winners:
-            raise ParameterViolationException("Cannot delete participants from an event that has already been drawn. Please reset the drawing first.")
+            # Check if the event has been drawn (has winners)
+            has_winners = await LotteryDAO.has_winners(conn, event_id)
+            if has_winners:
+                raise ParameterViolationException(message="Cannot delete participants from an event that has already been drawn. Please reset the drawing first.")
         
-        # Delete the participant
-        result = await LotteryDAO.delete_participant(conn, participant_id)
-        if not result:
-            raise ResourceNotFoundException(f"Participant with ID {participant_id} not found")
+            # Delete the participant
+            result = await LotteryDAO.delete_participant(conn, participant_id)
+            if not result:
+                raise ResourceNotFoundException(message=f"Participant with ID {participant_id} not found")
         
-        return {
-            "participant_id": result['id'],
-            "event_id": result['event_id'],
-            "message": "Participant deleted successfully"
-        }
+            return {
+                "participant_id": result['id'],
+                "event_id": result['event_id'],
+                "message": "Participant deleted successfully"
+            }
 
     @staticmethod
     async def delete_all_participants(conn, event_id):
         """Delete all participants for an event"""
-        # Check if event exists
-        event = await LotteryBusiness.get_lottery_event(conn, event_id)
+        async with EventLock.hold(conn, event_id):
+            # Check if event exists
+            event = await LotteryBusiness.get_lottery_event(conn, event_id)
         
-        # Check if the event has been drawn (has winners)
-        has_winners = await LotteryDAO.has_winners(conn, event_id)
-        if has_winners:
-            raise ParameterViolationException("Cannot delete participants from an event that has already been drawn. Please reset the drawing first.")
+            # Check if the event has been drawn (has winners)
+            has_winners = await LotteryDAO.has_winners(conn, event_id)
+            if has_winners:
+                raise ParameterViolationException(message="Cannot delete participants from an event that has already been drawn. Please reset the drawing first.")
         
-        # Delete all participants
-        deleted_participants = await LotteryDAO.delete_all_participants(conn, event_id)
+            # Delete all participants
+            deleted_participants = await LotteryDAO.delete_all_participants(conn, event_id)
         
-        return {
-            "event_id": event_id,
-            "deleted_participants_count": len(deleted_participants),
-            "message": f"Successfully deleted {len(deleted_participants)} participants"
-        }
+            return {
+                "event_id": event_id,
+                "deleted_participants_count": len(deleted_participants),
+                "message": f"Successfully deleted {len(deleted_participants)} participants"
+            }
 
     @staticmethod
     async def soft_delete_event(conn, event_id):
@@ -450,7 +1102,12 @@ class LotteryBusiness:
         result = await LotteryDAO.soft_delete_event(conn, event_id)
         if not result:
             raise ResourceNotFoundException(f"Failed to delete lottery event with ID {event_id}")
-        
+
+        # The published results of a deleted event must not stay public
+        try:
+            await ResultsBundle.remove(event_id)
+        except OSError as e:
+            logger.warning(f"Could not remove the results bundle of lottery event {event_id}: {e}")
         return result
 
     @staticmethod
@@ -460,7 +1117,8 @@ class LotteryBusiness:
         result = await LotteryDAO.restore_event(conn, event_id)
         if not result:
             raise ResourceNotFoundException(f"Deleted lottery event with ID {event_id} not found")
-        
+
+        await LotteryBusiness._refresh_results_bundle(conn, event_id)
         return result
 
     @staticmethod
@@ -0,0 +1,83 @@
+import asyncio
+import gzip
+import os
+import re
+import tempfile
+from contextlib import suppress
+from typing import Optional, Tuple
+
+from lottery_api.config import get_settings
+
+# Event IDs are UUIDs; anything else never maps to a bundle file
+_EVENT_ID_PATTERN = re.compile(r"[0-9A-Za-z-]{1,64}")
+
+
+class ResultsBundle:
+    """Pre-rendered public results files of drawn events (opt-in with results_bundle_enabled)
+
+    When a draw commits, the masked winners document of the event (the winners snapshot) is written to
+    results_bundle_dir as {event_id}.json, plus a pre-gzipped {event_id}.json.gz with results_bundle_gzip.
+    Files are replaced atomically, so readers never see a partial file, and removed when the drawing is reset.
+    Reads are plain file responses: no query and no serialization per request, and the directory can also be
+    served by a reverse proxy directly.
+    """
+
+    @staticmethod
+    def path(event_id: str, gzipped: bool = False) -> Optional[str]:
+        """The bundle file of an event, or None for an ID that can't be an event ID"""
+        if not _EVENT_ID_PATTERN.fullmatch(event_id):
+            return None
+        return os.path.join(get_settings().results_bundle_dir, f"{event_id}.json{'.gz' if gzipped else ''}")
+
+    @staticmethod
+    def find(event_id: str, accept_gzip: bool) -> Optional[Tuple[str, os.stat_result, bool]]:
+        """Find the bundle file to serve: (path, stat, gzipped), preferring the gzipped file when accepted"""
+        for gzipped in ((True, False) if accept_gzip else (False,)):
+            path = ResultsBundle.path(event_id, gzipped)
+            if path is None:
+                return None
+            with suppress(FileNotFoundError):
+                return path, os.stat(path), gzipped
+        return None
+
+    @staticmethod
+    async def write(event_id: str, document: bytes):
+        """Write (or replace) the bundle files of an event"""
+        await asyncio.to_thread(ResultsBundle._write, event_id, document)
+
+    @staticmethod
+    async def remove(event_id: str):
+        """Remove the bundle files of an event, if any"""
+        await asyncio.to_thread(ResultsBundle._remove, event_id)
+
+    @staticmethod
+    def _write(event_id, document):
+        settings = get_settings()
+        os.makedirs(settings.results_bundle_dir, exist_ok=True)
+        # The gzipped file goes first, so a fresh .json never sits next to a stale .json.gz
+        if settings.results_bundle_gzip:
+            _atomic_write(ResultsBundle.path(event_id, gzipped=True), gzip.compress(document, mtime=0))
+        else:
+            with suppress(FileNotFoundError):
+                os.remove(ResultsBundle.path(event_id, gzipped=True))
+        _atomic_write(ResultsBundle.path(event_id), document)
+
+    @staticmethod
+    def _remove(event_id):
+        for gzipped in (False, True):
+            with suppress(FileNotFoundError):
+                os.remove(ResultsBundle.path(event_id, gzipped))
+
+
+def _atomic_write(path, content):
+    """Write a file through a temporary file in the same directory and rename it into place"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
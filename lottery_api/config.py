@@ -9,6 +9,50 @@ class Settings(EnvironmentSettings):
     jwt_public_key: str
     jwt_private_key: Optional[str] = None
 
+    # In-process event metadata cache (set ttl or size to 0 to disable)
+    event_cache_ttl_seconds: float = 30.0
+    event_cache_max_size: int = 1024
+
+    # In-process index of the winning student IDs of each event, behind the public result lookup
+    winner_index_cache_ttl_seconds: float = 600.0
+    winner_index_cache_max_size: int = 256
+
+    # In-process remaining draw pool of events drawn in rounds, so later rounds don't reload the pool
+    round_pool_cache_ttl_seconds: float = 600.0
+    round_pool_cache_max_size: int = 64
+
+    # Shared connection pool, used by work that fans out over several connections (e.g. batch draws)
+    db_pool_max_size: int = 10
+    batch_draw_concurrency: int = 4
+
+    # Rows fetched per round trip (and sent per chunk) by the NDJSON participant stream
+    participant_stream_prefetch: int = 1000
+
+    # Idempotency-Key support: how long responses are replayed, and how long a retry waits for a running attempt
+    idempotency_key_ttl_seconds: float = 86400.0
+    idempotency_wait_seconds: float = 60.0
+
+    # Scheduled draws of auto_draw events at their event_date (opt-in: the scheduler only runs when enabled)
+    draw_scheduler_enabled: bool = False
+    draw_scheduler_poll_seconds: float = 30.0
+    draw_scheduler_concurrency: int = 2
+    draw_scheduler_lease_seconds: float = 300.0
+    draw_scheduler_retry_seconds: float = 300.0
+    draw_scheduler_max_attempts: int = 3
+
+    # Pre-rendered public results files written when a draw commits (opt-in), and how long clients may cache them
+    results_bundle_enabled: bool = False
+    results_bundle_dir: str = "exports/results"
+    results_bundle_gzip: bool = True
+    results_bundle_max_age_seconds: int = 300
+
+    # Response compression: gzip, plus zstd / br when the zstandard / brotli packages are installed
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+
 
 @lru_cache()
 def get_settings():
@@ -38,6 +38,32 @@ async def get_db_connection():
         await conn.close()
 
 class Database:
+    _pool = None
+    _pool_lock = asyncio.Lock()
+
+    @staticmethod
+    async def get_pool():
+        """Get the shared PostgreSQL connection pool, created on first use"""
+        async with Database._pool_lock:
+            if Database._pool is None:
+                Database._pool = await asyncpg.create_pool(
+                    user="local",
+                    password="local1234",
+                    database="postgres",
+                    host="localhost",
+                    port=5432,
+                    min_size=1,
+                    max_size=get_settings().db_pool_max_size
+                )
+        return Database._pool
+
+    @staticmethod
+    async def close_pool():
+        """Close the shared connection pool if it was created"""
+        if Database._pool is not None:
+            await Database._pool.close()
+            Database._pool = None
+
     @staticmethod
     async def get_connection():
         """Get PostgreSQL database connection"""
@@ -0,0 +1,61 @@
+from contextlib import asynccontextmanager
+from typing import List, Sequence
+
+from lottery_api.lib.base_exception import RestrictionException
+
+# First key of every event lock, so the locks don't collide with other advisory lock users of the database
+LOCK_NAMESPACE = 0x4C4F5454  # "LOTT"
+
+
+class EventLock:
+    """Per-event Postgres advisory locks that serialize draws, resets and participant changes of an event
+
+    The locks live in Postgres, so they hold across every worker and node without extra infrastructure.
+    They are session locks taken with pg_try_advisory_lock: a second request for a busy event fails right away
+    with a RestrictionException (409) instead of waiting or racing, and a lock is released with its connection
+    if the holder dies.
+    """
+
+    @staticmethod
+    def busy_error(event_id) -> RestrictionException:
+        """The error returned when another session holds the lock of an event"""
+        return RestrictionException(
+            message=f"Lottery event {event_id} is being drawn or modified by another request. Please try again."
+        )
+
+    @staticmethod
+    @asynccontextmanager
+    async def hold(conn, event_id):
+        """Hold the lock of an event for the duration of the block
+
+        Raises:
+            RestrictionException: another session holds the lock
+        """
+        if not await conn.fetchval("SELECT pg_try_advisory_lock($1, hashtext($2))", LOCK_NAMESPACE, event_id):
+            raise EventLock.busy_error(event_id)
+        try:
+            yield
+        finally:
+            if not conn.is_closed():
+                await conn.execute("SELECT pg_advisory_unlock($1, hashtext($2))", LOCK_NAMESPACE, event_id)
+
+    @staticmethod
+    async def try_acquire_many(conn, event_ids: Sequence[str]) -> List[str]:
+        """Try to lock many events in one query; returns the IDs that were locked (release them with release_many)"""
+        rows = await conn.fetch(
+            """
+            SELECT ids.event_id
+            FROM unnest($2::varchar[]) AS ids(event_id)
+            WHERE pg_try_advisory_lock($1, hashtext(ids.event_id))
+            """,
+            LOCK_NAMESPACE, list(event_ids)
+        )
+        return [row['event_id'] for row in rows]
+
+    @staticmethod
+    async def release_many(conn, event_ids: Sequence[str]):
+        if event_ids and not conn.is_closed():
+            await conn.execute(
+                "SELECT pg_advisory_unlock($1, hashtext(event_id)) FROM unnest($2::varchar[]) AS ids(event_id)",
+                LOCK_NAMESPACE, list(event_ids)
+            )
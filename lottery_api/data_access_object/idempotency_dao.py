@@ -0,0 +1,31 @@
+from lottery_api.data_access_object.db import Database
+
+
+class IdempotencyDAO:
+    """Data Access Object for the stored responses of idempotent requests"""
+
+    @staticmethod
+    async def get_response(conn, idempotency_key):
+        """Get the stored response of an idempotency key, unless it has expired"""
+        query = """
+        SELECT idempotency_key, fingerprint, status_code, response_body, created_at
+        FROM lottery_idempotency_keys
+        WHERE idempotency_key = $1 AND expires_at > CURRENT_TIMESTAMP
+        """
+        return await Database.fetchrow(conn, query, idempotency_key)
+
+    @staticmethod
+    async def save_response(conn, idempotency_key, fingerprint, status_code, response_body, ttl_seconds):
+        """Store the response of an idempotency key (replacing an expired one) and purge expired keys"""
+        query = """
+        WITH purged AS (
+            DELETE FROM lottery_idempotency_keys
+            WHERE expires_at <= CURRENT_TIMESTAMP AND idempotency_key <> $1
+        )
+        INSERT INTO lottery_idempotency_keys (idempotency_key, fingerprint, status_code, response_body, expires_at)
+        VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP + make_interval(secs => $5))
+        ON CONFLICT (idempotency_key) DO UPDATE
+        SET fingerprint = EXCLUDED.fingerprint, status_code = EXCLUDED.status_code,
+            response_body = EXCLUDED.response_body, created_at = CURRENT_TIMESTAMP, expires_at = EXCLUDED.expires_at
+        """
+        await Database.execute(conn, query, idempotency_key, fingerprint, status_code, response_body, float(ttl_seconds))
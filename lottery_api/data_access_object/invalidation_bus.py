@@ -0,0 +1,103 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import asyncpg
+
+from lottery_api.data_access_object.db import Database
+from lottery_api.lib.cache import TTLCache
+from lottery_api.lib.logger import get_prefix_logger_adapter
+
+logger = get_prefix_logger_adapter(__name__)
+
+CHANNEL = 'lottery_cache_invalidation'
+ALL_KEYS = '*'
+
+
+class InvalidationBus:
+    """Cross-worker cache invalidation over Postgres LISTEN/NOTIFY
+
+    Writers call ``publish`` with the connection they wrote on, so the NOTIFY is delivered only when
+    their transaction commits. Every worker keeps one LISTEN connection and evicts the matching key from
+    the caches registered for that entity ("event", "prizes", "winners", "participants").
+    """
+
+    _caches: Dict[str, List[TTLCache]] = defaultdict(list)
+    _task: Optional[asyncio.Task] = None
+    health_check_interval = 30
+    max_reconnect_delay = 30
+
+    @classmethod
+    def register(cls, entity: str, cache: TTLCache):
+        """Register a cache whose keys are evicted by invalidations of the given entity"""
+        cls._caches[entity].append(cache)
+
+    @classmethod
+    def evict(cls, entity: str, key: str):
+        """Evict a key (or every key with "*") from the local caches of an entity"""
+        for cache in cls._caches.get(entity, []):
+            if key == ALL_KEYS:
+                cache.clear()
+            else:
+                cache.invalidate(key)
+
+    @classmethod
+    def evict_all(cls):
+        for caches in cls._caches.values():
+            for cache in caches:
+                cache.clear()
+
+    @classmethod
+    async def publish(cls, conn, entity: str, key):
+        """Evict locally right away and notify the other workers once the current transaction commits"""
+        key = str(key)
+        cls.evict(entity, key)
+        await conn.execute("SELECT pg_notify($1, $2)", CHANNEL, f"{entity}:{key}")
+
+    @classmethod
+    def _on_notification(cls, connection, pid, channel, payload: str):
+        entity, _, key = payload.partition(':')
+        cls.evict(entity, key)
+
+    @classmethod
+    async def _listen(cls):
+        delay = 1
+        while True:
+            conn = None
+            try:
+                conn = await Database.get_connection()
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(CHANNEL, cls._on_notification)
+                # Notifications sent while we were not listening are gone, so start from empty caches
+                cls.evict_all()
+                delay = 1
+                logger.info(f"Listening for cache invalidations on channel {CHANNEL}")
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=cls.health_check_interval)
+                    except asyncio.TimeoutError:
+                        await conn.fetchval("SELECT 1")
+                logger.warning("Cache invalidation listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning(f"Cache invalidation listener failed: {e}. Retrying in {delay} seconds")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await asyncio.gather(conn.close(timeout=10), return_exceptions=True)
+            cls.evict_all()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, cls.max_reconnect_delay)
+
+    @classmethod
+    def start(cls):
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.get_running_loop().create_task(cls._listen())
+
+    @classmethod
+    async def stop(cls):
+        if cls._task is not None:
+            cls._task.cancel()
+            await asyncio.gather(cls._task, return_exceptions=True)
+            cls._task = None
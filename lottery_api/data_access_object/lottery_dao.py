@@ -1,8 +1,115 @@
+from lottery_api.config import get_settings
 from lottery_api.data_access_object.db import Database, OracleDatabase
+from lottery_api.data_access_object.invalidation_bus import InvalidationBus
+from lottery_api.lib.cache import TTLCache
+from lottery_api.utils.draw_engine import DrawPool
 from lottery_api.utils.privacy_protection import apply_privacy_mask
 import uuid
 import json
 
+# Event rows by id, read by almost every business operation; invalidated by every event mutation below
+event_cache = TTLCache(max_size=get_settings().event_cache_max_size, ttl=get_settings().event_cache_ttl_seconds)
+InvalidationBus.register('event', event_cache)
+
+# Per-event index of the prize won by each student ID, behind the public result lookup (see
+# LotteryBusiness.get_student_result); evicted by every event, prize and winner change
+winner_index_cache = TTLCache(max_size=get_settings().winner_index_cache_max_size,
+                              ttl=get_settings().winner_index_cache_ttl_seconds)
+InvalidationBus.register('event', winner_index_cache)
+InvalidationBus.register('prizes', winner_index_cache)
+InvalidationBus.register('winners', winner_index_cache)
+
+# Remaining draw pool of events drawn in rounds, with the event version it was left at (see
+# LotteryBusiness.draw_round); evicted by every event, participant and winner change
+round_pool_cache = TTLCache(max_size=get_settings().round_pool_cache_max_size,
+                            ttl=get_settings().round_pool_cache_ttl_seconds)
+InvalidationBus.register('event', round_pool_cache)
+InvalidationBus.register('participants', round_pool_cache)
+InvalidationBus.register('winners', round_pool_cache)
+
+
+# Columns of an event row as returned by every event query
+_EVENT_COLUMNS = (
+    "id, academic_year_term, name, description, event_date, type, status, is_deleted, created_at, "
+    "draw_weight, draw_seed, draw_pool_hash, auto_draw"
+)
+
+# Columns of a prize row as returned by every prize query
+_PRIZE_COLUMNS = "id, event_id, name, quantity, quota, drawn_at, round_name, created_at"
+
+# SQL mirror of the drawing eligibility rules (aliases: p = lottery_participants, e = lottery_events):
+# the participant needs a display name, and final_teaching participants must have both survey flags set to "Y"
+_DISPLAY_NAME_SQL = """
+COALESCE(NULLIF(p.meta->'oracle_info'->>'name', ''),
+         NULLIF(p.meta->'oracle_info'->>'chinese_name', ''),
+         NULLIF(p.meta->'oracle_info'->>'english_name', ''),
+         p.meta->'student_info'->>'name',
+         '')
+"""
+
+# Every character str.strip() removes (Unicode whitespace, e.g. tabs, newlines and the full-width space U+3000),
+# so a name made only of whitespace is not a display name, as in Python
+_WHITESPACE_SQL = (r"E'\u0009\u000a\u000b\u000c\u000d\u001c\u001d\u001e\u001f\u0020\u0085\u00a0\u1680\u2000\u2001"
+                   r"\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000'")
+
+_ELIGIBLE_CONDITION_SQL = f"""
+(btrim({_DISPLAY_NAME_SQL}, {_WHITESPACE_SQL}) <> ''
+ AND (e.type <> 'final_teaching'
+      OR (p.meta->'teaching_comments'->>'surveys_completed' = 'Y'
+          AND p.meta->'teaching_comments'->>'valid_surveys' = 'Y')))
+"""
+
+
+# Draw weight expressions by the event's draw_weight (alias p = lottery_participants); None means uniform.
+# Every eligible participant keeps at least weight 1, completed surveys add chances on top of it.
+_COMPLETED_SURVEYS_SQL = """
+(CASE WHEN p.meta #>> '{teaching_comments,completed_surveys}' ~ '^[0-9]+$'
+      THEN (p.meta #>> '{teaching_comments,completed_surveys}')::float8 ELSE 0 END)
+"""
+
+_REQUIRED_SURVEYS_SQL = """
+(CASE WHEN p.meta #>> '{teaching_comments,required_surveys}' ~ '^[0-9]+$'
+      THEN (p.meta #>> '{teaching_comments,required_surveys}')::float8 ELSE 0 END)
+"""
+
+_DRAW_WEIGHT_SQL = {
+    'uniform': None,
+    'completed_surveys': f"1 + {_COMPLETED_SURVEYS_SQL}",
+    'completion_ratio': f"1 + LEAST(COALESCE({_COMPLETED_SURVEYS_SQL} / NULLIF({_REQUIRED_SURVEYS_SQL}, 0), 0), 1)",
+}
+
+
+# Excludes students who already won an event of the same term (aliases: p = lottery_participants, e = lottery_events)
+_TERM_WINNER_EXCLUSION_SQL = """
+AND NOT EXISTS (
+    SELECT 1
+    FROM lottery_winners tw
+    JOIN lottery_events te ON te.id = tw.event_id AND te.is_deleted = FALSE
+    WHERE tw.academic_year_term = e.academic_year_term
+      AND tw.student_id = p.meta->'student_info'->>'id'
+)
+"""
+
+
+def _insert_winners_sql(source_sql):
+    """The one INSERT every winner goes through; source_sql yields rows w(prize_id, participant_id) and $1 is
+    the event ID. The term and student ID are denormalized onto the winner for term-wide exclusion."""
+    return f"""
+            INSERT INTO lottery_winners (event_id, prize_id, participant_id, academic_year_term, student_id)
+            SELECT e.id, w.prize_id, w.participant_id, e.academic_year_term, p.meta->'student_info'->>'id'
+            FROM {source_sql}
+            JOIN lottery_participants p ON p.id = w.participant_id
+            JOIN lottery_events e ON e.id = $1
+            RETURNING id, event_id, prize_id, participant_id, created_at
+    """
+
+
+# Values that prize quotas can group by (see PrizeQuota.field)
+_GROUP_FIELD_SQL = {
+    'department': "COALESCE(p.meta->'student_info'->>'department', '')",
+    'grade': "COALESCE(p.meta->'student_info'->>'grade', '')",
+}
+
 
 class LotteryDAO:
     """Data Access Object for lottery-related operations"""
@@ -33,26 +140,101 @@ class LotteryDAO:
             return False
 
     @staticmethod
-    async def create_lottery_event(conn, academic_year_term, name, description, event_date, type="general", status="pending"):
-        """Create a new lottery event"""
+    async def create_lottery_event(conn, academic_year_term, name, description, event_date, type="general", status="pending",
+                                   draw_weight="uniform", auto_draw=False):
+        """Create a new lottery event, with its first version (see bump_event_version) in the same statement"""
         event_id = str(uuid.uuid4())
+        query = f"""
+        WITH event AS (
+            INSERT INTO lottery_events (id, academic_year_term, name, description, event_date, type, status,
+                                        is_deleted, draw_weight, auto_draw)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, FALSE, $8, $9)
+            RETURNING {_EVENT_COLUMNS}
+        ), version AS (
+            INSERT INTO lottery_event_versions (event_id, version)
+            SELECT id, 1 FROM event
+        )
+        SELECT * FROM event
+        """
+        return await Database.fetchrow(conn, query, event_id, academic_year_term, name, description, event_date, type, status,
+                                       draw_weight, auto_draw)
+
+    @staticmethod
+    async def claim_due_draws(conn, owner, lease_seconds, limit, max_attempts):
+        """Lease up to limit auto_draw events whose event_date has passed, in event_date order
+
+        An event is claimable when it has no lease yet, or its lease has run out (a crashed node, or the retry time
+        after a failed attempt) with attempts left, and no scheduled draw of it succeeded. Concurrent claims of the
+        same event are serialized on the lease row, and ON CONFLICT only takes over an expired lease, so each event
+        is handed to one node only.
+
+        Returns:
+            [{'event_id', 'attempts'}] of the events leased to owner
+        """
+        query = """
+        INSERT INTO lottery_draw_leases (event_id, owner, leased_until, attempts, updated_at)
+        SELECT e.id, $1, LOCALTIMESTAMP + make_interval(secs => $2), 1, CURRENT_TIMESTAMP
+        FROM lottery_events e
+        WHERE e.auto_draw = TRUE AND e.status = 'pending' AND e.is_deleted = FALSE
+          AND e.event_date <= LOCALTIMESTAMP
+          AND NOT EXISTS (
+              SELECT 1 FROM lottery_draw_leases l
+              WHERE l.event_id = e.id
+                AND (l.leased_until > LOCALTIMESTAMP OR l.attempts >= $4 OR l.drawn_at IS NOT NULL)
+          )
+        ORDER BY e.event_date
+        LIMIT $3
+        ON CONFLICT (event_id) DO UPDATE
+        SET owner = EXCLUDED.owner, leased_until = EXCLUDED.leased_until,
+            attempts = lottery_draw_leases.attempts + 1, updated_at = CURRENT_TIMESTAMP
+        WHERE lottery_draw_leases.leased_until <= LOCALTIMESTAMP
+          AND lottery_draw_leases.attempts < $4
+          AND lottery_draw_leases.drawn_at IS NULL
+        RETURNING event_id, attempts
+        """
+        return await Database.fetch(conn, query, owner, float(lease_seconds), limit, max_attempts)
+
+    @staticmethod
+    async def finish_draw_lease(conn, event_id, owner, error=None, retry_seconds=0):
+        """Record the outcome of a scheduled draw: drawn, or failed and retryable after retry_seconds"""
+        query = """
+        UPDATE lottery_draw_leases
+        SET drawn_at = CASE WHEN $3::text IS NULL THEN CURRENT_TIMESTAMP END,
+            last_error = $3,
+            leased_until = LOCALTIMESTAMP + make_interval(secs => $4),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE event_id = $1 AND owner = $2
+        """
+        await Database.execute(conn, query, event_id, owner, error, float(retry_seconds))
+
+    @staticmethod
+    async def get_scheduled_draws(conn, limit=100):
+        """Get the auto_draw events that are still pending or were handled by the scheduler, by event_date"""
         query = """
-        INSERT INTO lottery_events (id, academic_year_term, name, description, event_date, type, status, is_deleted)
-        VALUES ($1, $2, $3, $4, $5, $6, $7, FALSE)
-        RETURNING id, academic_year_term, name, description, event_date, type, status, is_deleted, created_at
+        SELECT e.id AS event_id, e.name, e.event_date, e.status, l.owner, l.leased_until, l.attempts,
+               l.last_error, l.drawn_at
+        FROM lottery_events e
+        LEFT JOIN lottery_draw_leases l ON l.event_id = e.id
+        WHERE e.auto_draw = TRUE AND e.is_deleted = FALSE
+          AND (e.status = 'pending' OR l.event_id IS NOT NULL)
+        ORDER BY e.event_date, e.id
+        LIMIT $1
         """
-        return await Database.fetchrow(conn, query, event_id, academic_year_term, name, description, event_date, type, status)
+        return await Database.fetch(conn, query, limit)
 
     @staticmethod
     async def update_event_status(conn, event_id, status):
         """Update event status"""
-        query = """
+        query = f"""
         UPDATE lottery_events
         SET status = $2
         WHERE id = $1 AND is_deleted = FALSE
-        RETURNING id, academic_year_term, name, description, event_date, type, status, is_deleted, created_at
+        RETURNING {_EVENT_COLUMNS}
         """
-        return await Database.fetchrow(conn, query, event_id, status)
+        result = await Database.fetchrow(conn, query, event_id, status)
+        await InvalidationBus.publish(conn, 'event', event_id)
+        await LotteryDAO.bump_event_version(conn, event_id)
+        return result
 
     @staticmethod
     async def update_lottery_event(conn, event_id, **kwargs):
@@ -91,6 +273,16 @@ class LotteryDAO:
             set_clauses.append(f"type = ${param_count}")
             params.append(kwargs['type'])
             param_count += 1
+
+        if 'draw_weight' in kwargs and kwargs['draw_weight'] is not None:
+            set_clauses.append(f"draw_weight = ${param_count}")
+            params.append(kwargs['draw_weight'])
+            param_count += 1
+
+        if 'auto_draw' in kwargs and kwargs['auto_draw'] is not None:
+            set_clauses.append(f"auto_draw = ${param_count}")
+            params.append(kwargs['auto_draw'])
+            param_count += 1
         
         # If no fields to update, return None
         if not set_clauses:
@@ -101,42 +293,197 @@ class LotteryDAO:
         UPDATE lottery_events
         SET {', '.join(set_clauses)}
         WHERE id = $1 AND is_deleted = FALSE
-        RETURNING id, academic_year_term, name, description, event_date, type, status, is_deleted, created_at
+        RETURNING {_EVENT_COLUMNS}
         """
         
-        return await Database.fetchrow(conn, query, *params)
+        result = await Database.fetchrow(conn, query, *params)
+        await InvalidationBus.publish(conn, 'event', event_id)
+        await LotteryDAO.bump_event_version(conn, event_id)
+        return result
 
     @staticmethod
-    async def get_lottery_events(conn, limit=100, offset=0, event_type=None):
-        """Get all lottery events with pagination (excluding soft deleted)"""
+    async def get_lottery_events(conn, limit=100, offset=0, event_type=None, after_created_at=None, after_id=None):
+        """Get all lottery events with pagination (excluding soft deleted)
+
+        When after_created_at/after_id (the last row of the previous page) are given, keyset pagination on
+        (created_at, id) is used instead of OFFSET, served by the partial index on is_deleted = FALSE.
+        """
+        conditions = ["is_deleted = FALSE"]
+        params = [limit]
+        param_count = 2
+
         if event_type:
-            query = """
-            SELECT id, academic_year_term, name, description, event_date, type, status, is_deleted, created_at
-            FROM lottery_events
-            WHERE type = $3 AND is_deleted = FALSE
-            ORDER BY created_at DESC
-            LIMIT $1 OFFSET $2
-            """
-            return await Database.fetch(conn, query, limit, offset, event_type)
+            conditions.append(f"type = ${param_count}")
+            params.append(event_type)
+            param_count += 1
+
+        if after_created_at is not None and after_id is not None:
+            conditions.append(f"(created_at, id) < (${param_count}, ${param_count + 1})")
+            params.extend([after_created_at, after_id])
+            param_count += 2
+            offset_clause = ""
         else:
-            query = """
-            SELECT id, academic_year_term, name, description, event_date, type, status, is_deleted, created_at
-            FROM lottery_events
-            WHERE is_deleted = FALSE
-            ORDER BY created_at DESC
-            LIMIT $1 OFFSET $2
-            """
-            return await Database.fetch(conn, query, limit, offset)
+            offset_clause = f"OFFSET ${param_count}"
+            params.append(offset)
+
+        query = f"""
+        SELECT {_EVENT_COLUMNS}
+        FROM lottery_events
+        WHERE {' AND '.join(conditions)}
+        ORDER BY created_at DESC, id DESC
+        LIMIT $1 {offset_clause}
+        """
+        return await Database.fetch(conn, query, *params)
+
+    @staticmethod
+    async def get_event_counts(conn, event_ids):
+        """Get participant, prize and winner counts for many events in a single grouped query"""
+        if not event_ids:
+            return {}
+
+        query = """
+        SELECT ids.event_id,
+               COALESCE(pc.participant_count, 0) AS participant_count,
+               COALESCE(pz.prize_count, 0) AS prize_count,
+               COALESCE(pz.prize_quantity, 0) AS prize_quantity,
+               COALESCE(wc.winner_count, 0) AS winner_count
+        FROM unnest($1::varchar[]) AS ids(event_id)
+        LEFT JOIN (
+            SELECT event_id, COUNT(*) AS participant_count
+            FROM lottery_participants
+            WHERE event_id = ANY($1::varchar[])
+            GROUP BY event_id
+        ) pc ON pc.event_id = ids.event_id
+        LEFT JOIN (
+            SELECT event_id, COUNT(*) AS prize_count, SUM(quantity) AS prize_quantity
+            FROM lottery_prizes
+            WHERE event_id = ANY($1::varchar[])
+            GROUP BY event_id
+        ) pz ON pz.event_id = ids.event_id
+        LEFT JOIN (
+            SELECT event_id, COUNT(*) AS winner_count
+            FROM lottery_winners
+            WHERE event_id = ANY($1::varchar[])
+            GROUP BY event_id
+        ) wc ON wc.event_id = ids.event_id
+        """
+        rows = await Database.fetch(conn, query, list(event_ids))
+        return {row.pop('event_id'): row for row in rows}
+
+    @staticmethod
+    async def bump_event_version(conn, event_id):
+        """Bump the version of an event and drop its winners snapshot, which was built from an older version
+
+        Every mutation of the event, its participants, prizes or winners calls it. The snapshot is deleted in a
+        second statement, after the version row is locked: a concurrent rebuild stores its document only while
+        holding a share lock on that row and seeing the version it built from (see save_winners_snapshot), so
+        the rebuild either commits before this DELETE (which then removes it) or sees the new version and skips.
+        """
+        query = """
+        INSERT INTO lottery_event_versions (event_id, version)
+        VALUES ($1, 1)
+        ON CONFLICT (event_id) DO UPDATE
+        SET version = lottery_event_versions.version + 1, updated_at = CURRENT_TIMESTAMP
+        """
+        await Database.execute(conn, query, event_id)
+        await Database.execute(conn, "DELETE FROM lottery_winner_snapshots WHERE event_id = $1", event_id)
+
+    @staticmethod
+    async def get_event_version(conn, event_id):
+        """Get the version of an event (0 before its first mutation), or None if it doesn't exist or is deleted"""
+        query = """
+        SELECT COALESCE(v.version, 0) AS version
+        FROM lottery_events e
+        LEFT JOIN lottery_event_versions v ON v.event_id = e.id
+        WHERE e.id = $1 AND e.is_deleted = FALSE
+        """
+        return await Database.fetchval(conn, query, event_id)
+
+    @staticmethod
+    async def get_events_version(conn):
+        """A version of the whole event list: each bump adds exactly one to the sum, so any mutation changes it"""
+        query = """
+        SELECT count(*) || '.' || COALESCE(sum(version), 0)
+        FROM lottery_event_versions
+        """
+        return await Database.fetchval(conn, query)
 
     @staticmethod
     async def get_lottery_event_by_id(conn, event_id):
         """Get a lottery event by ID (excluding soft deleted)"""
-        query = """
-        SELECT id, academic_year_term, name, description, event_date, type, status, is_deleted, created_at
+        query = f"""
+        SELECT {_EVENT_COLUMNS}
         FROM lottery_events
         WHERE id = $1 AND is_deleted = FALSE
         """
-        return await Database.fetchrow(conn, query, event_id)
+        cached = event_cache.get(event_id)
+        if cached is not None:
+            return dict(cached)
+
+        result = await Database.fetchrow(conn, query, event_id)
+        if result:
+            event_cache.set(event_id, dict(result))
+        return result
+
+    @staticmethod
+    async def get_lottery_events_by_ids(conn, event_ids):
+        """Get many lottery events (excluding soft deleted) with whether each already has winners, by ID"""
+        query = f"""
+        SELECT {_EVENT_COLUMNS},
+               EXISTS (SELECT 1 FROM lottery_winners w WHERE w.event_id = e.id) AS has_winners
+        FROM lottery_events e
+        WHERE e.id = ANY($1::varchar[]) AND e.is_deleted = FALSE
+        """
+        rows = await Database.fetch(conn, query, list(event_ids))
+        return {row['id']: row for row in rows}
+
+    @staticmethod
+    async def get_event_summary(conn, event_id):
+        """Get event metadata, prizes with fill status and participant/eligible/winner counts in one query"""
+        query = f"""
+        SELECT e.id, e.academic_year_term, e.name, e.description, e.event_date, e.type, e.status, e.is_deleted,
+               e.created_at, e.draw_weight, e.draw_seed, e.draw_pool_hash, e.auto_draw, pc.participant_count, pc.eligible_count, wc.winner_count,
+               COALESCE(pz.prizes, '[]'::json) AS prizes
+        FROM lottery_events e
+        LEFT JOIN LATERAL (
+            SELECT COUNT(*) AS participant_count,
+                   COUNT(*) FILTER (WHERE {_ELIGIBLE_CONDITION_SQL}) AS eligible_count
+            FROM lottery_participants p
+            WHERE p.event_id = e.id
+        ) pc ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT COUNT(*) AS winner_count
+            FROM lottery_winners w
+            WHERE w.event_id = e.id
+        ) wc ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT json_agg(json_build_object(
+                       'id', pr.id,
+                       'event_id', pr.event_id,
+                       'name', pr.name,
+                       'quantity', pr.quantity,
+                       'quota', pr.quota,
+                       'drawn_at', pr.drawn_at,
+                       'round_name', pr.round_name,
+                       'created_at', pr.created_at,
+                       'winner_count', COALESCE(pw.winner_count, 0),
+                       'is_filled', COALESCE(pw.winner_count, 0) >= pr.quantity
+                   ) ORDER BY pr.id) AS prizes
+            FROM lottery_prizes pr
+            LEFT JOIN (
+                SELECT prize_id, COUNT(*) AS winner_count
+                FROM lottery_winners
+                WHERE event_id = e.id
+                GROUP BY prize_id
+            ) pw ON pw.prize_id = pr.id
+            WHERE pr.event_id = e.id
+        ) pz ON TRUE
+        WHERE e.id = $1 AND e.is_deleted = FALSE
+        """
+        result = await Database.fetchrow(conn, query, event_id)
+        if result:
+            result['prizes'] = json.loads(result['prizes']) if isinstance(result['prizes'], str) else result['prizes']
+        return result
 
     @staticmethod
     async def add_participant(conn, event_id, participant_data):
@@ -187,6 +534,8 @@ class LotteryDAO:
         if result:
             # Parse meta field
             result['meta'] = LotteryDAO._parse_meta(result['meta'])
+            await InvalidationBus.publish(conn, 'participants', event_id)
+            await LotteryDAO.bump_event_version(conn, event_id)
         return result
 
     @staticmethod
@@ -224,7 +573,7 @@ class LotteryDAO:
         return existing_participants
 
     @staticmethod
-    async def update_participant(conn, participant_id, meta_data):
+    async def update_participant(conn, participant_id, meta_data, notify=True):
         """Update an existing participant's meta data"""
         query = """
         UPDATE lottery_participants
@@ -235,6 +584,9 @@ class LotteryDAO:
         result = await Database.fetchrow(conn, query, participant_id, json.dumps(meta_data))
         if result:
             result['meta'] = LotteryDAO._parse_meta(result['meta'])
+            if notify:
+                await InvalidationBus.publish(conn, 'participants', result['event_id'])
+                await LotteryDAO.bump_event_version(conn, result['event_id'])
         return result
 
     @staticmethod
@@ -337,7 +689,7 @@ class LotteryDAO:
         # Update existing participants
         if update_data:
             for participant_id, meta_data in update_data:
-                result = await LotteryDAO.update_participant(conn, participant_id, meta_data)
+                result = await LotteryDAO.update_participant(conn, participant_id, meta_data, notify=False)
                 if result:
                     results.append(result)
                     updated_count += 1
@@ -355,6 +707,10 @@ class LotteryDAO:
                     result['meta'] = LotteryDAO._parse_meta(result['meta'])
                     results.append(result)
                     inserted_count += 1
+
+        if results:
+            await InvalidationBus.publish(conn, 'participants', event_id)
+            await LotteryDAO.bump_event_version(conn, event_id)
         
         return {
             "imported": results,
@@ -376,52 +732,65 @@ class LotteryDAO:
         LIMIT $2 OFFSET $3
         """
         rows = await Database.fetch(conn, query, event_id, limit, offset)
+        return [LotteryDAO._to_participant(row) for row in rows]
+
+    @staticmethod
+    async def iter_participants(conn, event_id, prefetch=1000):
+        """Iterate over every participant of an event through a server-side cursor, prefetch rows at a time
+
+        Must run inside a transaction; only one batch of rows is held in memory.
+        """
+        query = """
+        SELECT id, event_id, meta, created_at
+        FROM lottery_participants
+        WHERE event_id = $1
+        ORDER BY id
+        """
+        async for row in conn.cursor(query, event_id, prefetch=prefetch):
+            yield LotteryDAO._to_participant(row)
+
+    @staticmethod
+    def _to_participant(row):
+        """Flatten the meta of a participant row and apply the privacy mask"""
+        meta = LotteryDAO._parse_meta(row['meta'])
+        student_info = meta.get('student_info', {})
+        teaching_comments = meta.get('teaching_comments', {})
+        oracle_info = meta.get('oracle_info', {})
+        final_teaching_info = meta.get('final_teaching_info', {})
         
-        # Transform the data to flatten meta information
-        participants = []
-        for row in rows:
-            meta = LotteryDAO._parse_meta(row['meta'])
-            student_info = meta.get('student_info', {})
-            teaching_comments = meta.get('teaching_comments', {})
-            oracle_info = meta.get('oracle_info', {})
-            final_teaching_info = meta.get('final_teaching_info', {})
-            
-            # Prioritize Oracle name data over student_info name
-            display_name = (
-                oracle_info.get('name') or 
-                oracle_info.get('chinese_name') or 
-                oracle_info.get('english_name') or 
-                student_info.get('name', '')
-            )
-            
-            participant = {
-                'id': row['id'],
-                'event_id': row['event_id'],
-                'created_at': row['created_at'],
-                'student_id': student_info.get('id', ''),
-                'department': student_info.get('department', ''),
-                'name': display_name,
-                'grade': student_info.get('grade', ''),
-                'required_surveys': teaching_comments.get('required_surveys'),
-                'completed_surveys': teaching_comments.get('completed_surveys'),
-                'surveys_completed': teaching_comments.get('surveys_completed'),
-                'valid_surveys': teaching_comments.get('valid_surveys'),
-                # Oracle data - only include necessary fields for frontend (with privacy masking)
-                'oracle_student_id': oracle_info.get('student_id', ''),
-                'chinese_name': oracle_info.get('chinese_name', ''),
-                'english_name': oracle_info.get('english_name', ''),
-                # Final teaching complete data - only for final_teaching events
-                'id_number': final_teaching_info.get('id_number', ''),
-                'address': final_teaching_info.get('address', ''),
-                'student_type': final_teaching_info.get('student_type', ''),
-                'phone': final_teaching_info.get('phone', ''),
-                'email': final_teaching_info.get('email', ''),
-            }
-            # 應用個資遮罩
-            participant = apply_privacy_mask(participant)
-            participants.append(participant)
+        # Prioritize Oracle name data over student_info name
+        display_name = (
+            oracle_info.get('name') or 
+            oracle_info.get('chinese_name') or 
+            oracle_info.get('english_name') or 
+            student_info.get('name', '')
+        )
         
-        return participants
+        participant = {
+            'id': row['id'],
+            'event_id': row['event_id'],
+            'created_at': row['created_at'],
+            'student_id': student_info.get('id', ''),
+            'department': student_info.get('department', ''),
+            'name': display_name,
+            'grade': student_info.get('grade', ''),
+            'required_surveys': teaching_comments.get('required_surveys'),
+            'completed_surveys': teaching_comments.get('completed_surveys'),
+            'surveys_completed': teaching_comments.get('surveys_completed'),
+            'valid_surveys': teaching_comments.get('valid_surveys'),
+            # Oracle data - only include necessary fields for frontend (with privacy masking)
+            'oracle_student_id': oracle_info.get('student_id', ''),
+            'chinese_name': oracle_info.get('chinese_name', ''),
+            'english_name': oracle_info.get('english_name', ''),
+            # Final teaching complete data - only for final_teaching events
+            'id_number': final_teaching_info.get('id_number', ''),
+            'address': final_teaching_info.get('address', ''),
+            'student_type': final_teaching_info.get('student_type', ''),
+            'phone': final_teaching_info.get('phone', ''),
+            'email': final_teaching_info.get('email', ''),
+        }
+        # 應用個資遮罩
+        return apply_privacy_mask(participant)
 
     @staticmethod
     async def count_participants(conn, event_id):
@@ -433,56 +802,257 @@ class LotteryDAO:
         return await Database.fetchval(conn, query, event_id)
 
     @staticmethod
-    async def create_prize(conn, event_id, name, quantity):
+    def _to_prize(row):
+        """Parse the quota JSON of a prize row"""
+        if row is None:
+            return None
+        prize = dict(row)
+        prize['quota'] = json.loads(prize['quota']) if prize.get('quota') else None
+        return prize
+
+    @staticmethod
+    async def create_prize(conn, event_id, name, quantity, quota=None):
         """Create a prize for a lottery event"""
-        query = """
-        INSERT INTO lottery_prizes (event_id, name, quantity)
-        VALUES ($1, $2, $3)
-        RETURNING id, event_id, name, quantity, created_at
+        query = f"""
+        INSERT INTO lottery_prizes (event_id, name, quantity, quota)
+        VALUES ($1, $2, $3, $4::jsonb)
+        RETURNING {_PRIZE_COLUMNS}
         """
-        return await Database.fetchrow(conn, query, event_id, name, quantity)
+        result = await Database.fetchrow(conn, query, event_id, name, quantity,
+                                         json.dumps(quota) if quota else None)
+        await InvalidationBus.publish(conn, 'prizes', event_id)
+        await LotteryDAO.bump_event_version(conn, event_id)
+        return LotteryDAO._to_prize(result)
 
     @staticmethod
     async def get_prizes(conn, event_id):
         """Get prizes for a lottery event"""
-        query = """
-        SELECT id, event_id, name, quantity, created_at
+        query = f"""
+        SELECT {_PRIZE_COLUMNS}
         FROM lottery_prizes
         WHERE event_id = $1
         ORDER BY id
         """
-        return await Database.fetch(conn, query, event_id)
+        return [LotteryDAO._to_prize(row) for row in await Database.fetch(conn, query, event_id)]
 
     @staticmethod
-    async def update_prize(conn, prize_id, name, quantity):
-        """Update a prize"""
-        query = """
+    async def get_prizes_by_event_ids(conn, event_ids):
+        """Get the prizes of many lottery events, grouped by event ID and ordered like get_prizes"""
+        query = f"""
+        SELECT {_PRIZE_COLUMNS}
+        FROM lottery_prizes
+        WHERE event_id = ANY($1::varchar[])
+        ORDER BY event_id, id
+        """
+        prizes_by_event = {event_id: [] for event_id in event_ids}
+        for row in await Database.fetch(conn, query, list(event_ids)):
+            prizes_by_event[row['event_id']].append(LotteryDAO._to_prize(row))
+        return prizes_by_event
+
+    @staticmethod
+    async def update_prize(conn, prize_id, name, quantity, quota=None, update_quota=False):
+        """Update a prize; the quota is only replaced (or removed with None) when update_quota is set"""
+        query = f"""
         UPDATE lottery_prizes
-        SET name = $2, quantity = $3
+        SET name = $2, quantity = $3, quota = CASE WHEN $5 THEN $4::jsonb ELSE quota END
         WHERE id = $1
-        RETURNING id, event_id, name, quantity, created_at
+        RETURNING {_PRIZE_COLUMNS}
         """
-        return await Database.fetchrow(conn, query, prize_id, name, quantity)
+        result = await Database.fetchrow(conn, query, prize_id, name, quantity,
+                                         json.dumps(quota) if quota else None, update_quota)
+        if result:
+            await InvalidationBus.publish(conn, 'prizes', result['event_id'])
+            await LotteryDAO.bump_event_version(conn, result['event_id'])
+        return LotteryDAO._to_prize(result)
 
     @staticmethod
     async def delete_prize(conn, prize_id):
-        """Delete a prize"""
+        """Delete a prize; returns its id and event_id"""
         query = """
         DELETE FROM lottery_prizes
         WHERE id = $1
-        RETURNING id
+        RETURNING id, event_id
         """
-        return await Database.fetchval(conn, query, prize_id)
+        result = await Database.fetchrow(conn, query, prize_id)
+        if not result:
+            return None
+        await InvalidationBus.publish(conn, 'prizes', result['event_id'])
+        await LotteryDAO.bump_event_version(conn, result['event_id'])
+        return result
 
     @staticmethod
     async def save_winner(conn, event_id, prize_id, participant_id):
         """Save a winner"""
+        query = _insert_winners_sql("(VALUES ($2::int, $3::int)) AS w(prize_id, participant_id)")
+        result = await Database.fetchrow(conn, query, event_id, prize_id, participant_id)
+        await InvalidationBus.publish(conn, 'winners', event_id)
+        await LotteryDAO.bump_event_version(conn, event_id)
+        return result
+
+    @staticmethod
+    async def save_draw_results(conn, event_id, prize_ids, participant_ids, status="drawn",
+                                draw_seed=None, draw_pool_hash=None):
+        """Bulk insert all winners of a draw and flip the event status in a single statement and transaction
+
+        The seed and pool snapshot hash of the draw are stored on the event in the same statement.
+        """
+        query = f"""
+        WITH inserted AS (
+            {_insert_winners_sql("unnest($2::int[], $3::int[]) AS w(prize_id, participant_id)")}
+        ), updated AS (
+            UPDATE lottery_events
+            SET status = $4, draw_seed = $5, draw_pool_hash = $6
+            WHERE id = $1 AND is_deleted = FALSE
+            RETURNING id
+        ), drawn_prizes AS (
+            UPDATE lottery_prizes
+            SET drawn_at = CURRENT_TIMESTAMP
+            WHERE event_id = $1 AND drawn_at IS NULL
+        )
+        SELECT id, event_id, prize_id, participant_id, created_at
+        FROM inserted
+        """
+        async with conn.transaction():
+            result = await Database.fetch(conn, query, event_id, list(prize_ids), list(participant_ids), status,
+                                          draw_seed, draw_pool_hash)
+            await InvalidationBus.publish(conn, 'winners', event_id)
+            await InvalidationBus.publish(conn, 'prizes', event_id)
+            await InvalidationBus.publish(conn, 'event', event_id)
+            await LotteryDAO.bump_event_version(conn, event_id)
+        return result
+
+    @staticmethod
+    async def save_round_results(conn, event_id, round_name, round_prize_ids, prize_ids, participant_ids):
+        """Insert the winners of a round, mark its prizes as drawn and move the event to 'in_progress',
+        or to 'drawn' once no prize is left
+
+        Returns:
+            (inserted winner rows, new event status)
+        """
+        query = f"""
+        WITH inserted AS (
+            {_insert_winners_sql("unnest($4::int[], $5::int[]) AS w(prize_id, participant_id)")}
+        ), drawn_prizes AS (
+            UPDATE lottery_prizes
+            SET drawn_at = CURRENT_TIMESTAMP, round_name = $2
+            WHERE event_id = $1 AND id = ANY($3::int[])
+        )
+        SELECT id, event_id, prize_id, participant_id, created_at
+        FROM inserted
+        """
+        status_query = """
+        UPDATE lottery_events e
+        SET status = CASE
+            WHEN EXISTS (SELECT 1 FROM lottery_prizes pr WHERE pr.event_id = e.id AND pr.drawn_at IS NULL)
+            THEN 'in_progress' ELSE 'drawn' END
+        WHERE e.id = $1 AND e.is_deleted = FALSE
+        RETURNING e.status
+        """
+        async with conn.transaction():
+            result = await Database.fetch(conn, query, event_id, round_name, list(round_prize_ids),
+                                          list(prize_ids), list(participant_ids))
+            status = await Database.fetchval(conn, status_query, event_id)
+            await InvalidationBus.publish(conn, 'winners', event_id)
+            await InvalidationBus.publish(conn, 'prizes', event_id)
+            await InvalidationBus.publish(conn, 'event', event_id)
+            await LotteryDAO.bump_event_version(conn, event_id)
+        return result, status
+
+    @staticmethod
+    async def reset_prize_rounds(conn, event_id):
+        """Mark every prize of an event as not drawn yet"""
         query = """
-        INSERT INTO lottery_winners (event_id, prize_id, participant_id)
-        VALUES ($1, $2, $3)
-        RETURNING id, event_id, prize_id, participant_id, created_at
+        UPDATE lottery_prizes
+        SET drawn_at = NULL, round_name = NULL
+        WHERE event_id = $1
+        """
+        await Database.execute(conn, query, event_id)
+        await InvalidationBus.publish(conn, 'prizes', event_id)
+        await LotteryDAO.bump_event_version(conn, event_id)
+
+    @staticmethod
+    async def save_draw_audit(conn, event_id, seed, algorithm, numpy_version, pool_hash, pool_snapshot,
+                              prize_ids, quantities, winner_ids, draw_weight="uniform", weights_snapshot=None,
+                              quotas=None, department_snapshot=None, grade_snapshot=None, alternate_counts=None,
+                              draw_type="draw"):
+        """Append the audit record of a draw (seed, pool snapshot and drawn IDs in drawing order)"""
+        query = """
+        INSERT INTO lottery_draw_audits (event_id, seed, algorithm, numpy_version, pool_hash, pool_snapshot,
+                                         prize_ids, quantities, winner_ids, draw_weight, weights_snapshot,
+                                         quotas, department_snapshot, grade_snapshot, alternate_counts, draw_type)
+        VALUES ($1, $2, $3, $4, $5, $6, $7::int[], $8::int[], $9::int[], $10, $11, $12::jsonb, $13, $14, $15::int[],
+                $16)
+        RETURNING id, created_at
         """
-        return await Database.fetchrow(conn, query, event_id, prize_id, participant_id)
+        return await Database.fetchrow(conn, query, event_id, seed, algorithm, numpy_version, pool_hash,
+                                       pool_snapshot, list(prize_ids), list(quantities), list(winner_ids),
+                                       draw_weight, weights_snapshot, json.dumps(quotas) if quotas else None,
+                                       department_snapshot, grade_snapshot, alternate_counts, draw_type)
+
+    @staticmethod
+    async def get_latest_draw_audit(conn, event_id):
+        """Get the audit record of the most recent draw of an event"""
+        query = """
+        SELECT id, event_id, seed, algorithm, numpy_version, pool_hash, pool_snapshot,
+               prize_ids, quantities, winner_ids, draw_weight, weights_snapshot,
+               quotas, department_snapshot, grade_snapshot, alternate_counts, draw_type, created_at
+        FROM lottery_draw_audits
+        WHERE event_id = $1
+        ORDER BY id DESC
+        LIMIT 1
+        """
+        return await Database.fetchrow(conn, query, event_id)
+
+    @staticmethod
+    async def clear_draw_seed(conn, event_id):
+        """Clear the seed and pool hash of the last draw from the event (the audit log is kept)"""
+        query = """
+        UPDATE lottery_events
+        SET draw_seed = NULL, draw_pool_hash = NULL
+        WHERE id = $1
+        """
+        await Database.execute(conn, query, event_id)
+        await InvalidationBus.publish(conn, 'event', event_id)
+        await LotteryDAO.bump_event_version(conn, event_id)
+
+    @staticmethod
+    async def replace_prize_winners(conn, event_id, replaced_prize_ids, prize_ids, participant_ids):
+        """Delete the winners of the replaced prizes and insert the new winners in a single statement
+
+        Returns:
+            (inserted winner rows, number of deleted winners by prize ID)
+        """
+        query = f"""
+        WITH removed AS (
+            DELETE FROM lottery_winners
+            WHERE event_id = $1 AND prize_id = ANY($2::int[])
+            RETURNING prize_id
+        ), inserted AS (
+            {_insert_winners_sql("unnest($3::int[], $4::int[]) AS w(prize_id, participant_id)")}
+        )
+        SELECT 'inserted' AS kind, id, prize_id, participant_id, NULL::bigint AS removed_count FROM inserted
+        UNION ALL
+        SELECT 'removed', NULL, prize_id, NULL, COUNT(*) FROM removed GROUP BY prize_id
+        """
+        rows = await Database.fetch(conn, query, event_id, list(replaced_prize_ids), list(prize_ids),
+                                    list(participant_ids))
+        await InvalidationBus.publish(conn, 'winners', event_id)
+        await LotteryDAO.bump_event_version(conn, event_id)
+        inserted = [row for row in rows if row['kind'] == 'inserted']
+        removed = {row['prize_id']: row['removed_count'] for row in rows if row['kind'] == 'removed'}
+        return inserted, removed
+
+    @staticmethod
+    async def get_prize_winner_counts(conn, event_id):
+        """Get the number of winners of every prize of an event"""
+        query = """
+        SELECT prize_id, COUNT(*) AS winner_count
+        FROM lottery_winners
+        WHERE event_id = $1
+        GROUP BY prize_id
+        """
+        rows = await Database.fetch(conn, query, event_id)
+        return {row['prize_id']: row['winner_count'] for row in rows}
 
     @staticmethod
     async def has_winners(conn, event_id):
@@ -551,6 +1121,54 @@ class LotteryDAO:
         
         return winners
 
+    @staticmethod
+    async def get_winner_index(conn, event_id):
+        """Get the status of an event and the prize name won by each winning student ID, in one query
+
+        Returns None if the event doesn't exist or is deleted.
+        """
+        query = """
+        SELECT e.status, w.student_id, pr.name AS prize_name
+        FROM lottery_events e
+        LEFT JOIN lottery_winners w ON w.event_id = e.id
+        LEFT JOIN lottery_prizes pr ON pr.id = w.prize_id
+        WHERE e.id = $1 AND e.is_deleted = FALSE
+        """
+        rows = await Database.fetch(conn, query, event_id)
+        if not rows:
+            return None
+        return {
+            "status": rows[0]['status'],
+            "winners": {row['student_id']: row['prize_name'] for row in rows if row['student_id']}
+        }
+
+    @staticmethod
+    async def get_winners_snapshot(conn, event_id):
+        """Get the stored winners document of an event and its ETag"""
+        query = """
+        SELECT event_id, document, etag, created_at
+        FROM lottery_winner_snapshots
+        WHERE event_id = $1
+        """
+        return await Database.fetchrow(conn, query, event_id)
+
+    @staticmethod
+    async def save_winners_snapshot(conn, event_id, document, etag, version=None):
+        """Store (or replace) the winners document of an event
+
+        With a version (read before the document was built), the document is only stored while the event is
+        still at that version, so a rebuild never overwrites the invalidation of a concurrent change.
+        """
+        query = """
+        INSERT INTO lottery_winner_snapshots (event_id, document, etag)
+        SELECT $1::varchar, $2::bytea, $3::varchar
+        WHERE $4::bigint IS NULL
+           OR COALESCE((SELECT version FROM lottery_event_versions WHERE event_id = $1 FOR SHARE), 0) = $4
+        ON CONFLICT (event_id) DO UPDATE
+        SET document = EXCLUDED.document, etag = EXCLUDED.etag, created_at = CURRENT_TIMESTAMP
+        """
+        await Database.execute(conn, query, event_id, document, etag, version)
+
     @staticmethod
     async def get_winners_for_export(conn, event_id):
         """Get winners for export (without privacy masking)"""
@@ -614,86 +1232,242 @@ class LotteryDAO:
         return winners
 
     @staticmethod
-    async def get_non_winners(conn, event_id):
-        """Get participants who haven't won any prize yet and are eligible for drawing"""
-        # First get the event type to determine eligibility criteria
-        event = await LotteryDAO.get_lottery_event_by_id(conn, event_id)
+    def _eligible_pool_query(event_id_sql, weight_sql, group_fields, term_exclusive):
+        """Build the pool query of one event: a single row with the pool IDs (and weights / group codes) as strings"""
+        pool_columns = ["p.id"]
+        aggregates = ["string_agg(pool.id::text, ',' ORDER BY pool.id) AS ids"]
+        if weight_sql:
+            pool_columns.append(f"({weight_sql})::float8 AS weight")
+            aggregates.append("string_agg(pool.weight::text, ',' ORDER BY pool.id) AS weights")
+        for field in group_fields:
+            value_sql = _GROUP_FIELD_SQL[field]
+            pool_columns.append(f"{value_sql} AS {field}")
+            pool_columns.append(f"dense_rank() OVER (ORDER BY {value_sql}) - 1 AS {field}_code")
+            aggregates.append(f"string_agg(pool.{field}_code::text, ',' ORDER BY pool.id) AS {field}_codes")
+            aggregates.append(f"array_agg(DISTINCT pool.{field} ORDER BY pool.{field}) AS {field}_labels")
+
+        return f"""
+        SELECT {', '.join(aggregates)}
+        FROM (
+            SELECT {', '.join(pool_columns)}
+            FROM lottery_participants p
+            JOIN lottery_events e ON e.id = p.event_id
+            WHERE p.event_id = {event_id_sql}
+              AND {_ELIGIBLE_CONDITION_SQL}
+              AND NOT EXISTS (
+                  SELECT 1 FROM lottery_winners w
+                  WHERE w.event_id = p.event_id AND w.participant_id = p.id
+              )
+              AND NOT EXISTS (
+                  SELECT 1 FROM lottery_alternates a
+                  WHERE a.event_id = p.event_id AND a.participant_id = p.id
+              )
+              {_TERM_WINNER_EXCLUSION_SQL if term_exclusive else ""}
+        ) pool
+        """
+
+    @staticmethod
+    def _to_draw_pool(row, weighted, group_fields):
+        """Parse a row of the pool query into a DrawPool"""
+        return DrawPool.from_text(
+            row['ids'],
+            row['weights'] if weighted else None,
+            {field: row[f'{field}_codes'] for field in group_fields},
+            {field: list(row[f'{field}_labels'] or []) for field in group_fields}
+        )
+
+    @staticmethod
+    async def get_eligible_pool(conn, event_id, draw_weight="uniform", group_fields=(), term_exclusive=False):
+        """Get the draw pool: IDs of eligible participants who aren't winners or alternates yet, ordered by ID
+
+        With term_exclusive, students who already won any (not deleted) event of the same academic year term are
+        excluded too, through the (academic_year_term, student_id) index on winners.
+
+        Eligibility is evaluated in SQL (see _ELIGIBLE_CONDITION_SQL) and the IDs come back as one
+        comma separated string that is parsed straight into an int64 array, so no rows are materialized.
+        Weights and the group codes of the requested quota fields are aggregated the same way, aligned with the IDs.
+        """
+        weight_sql = _DRAW_WEIGHT_SQL[draw_weight]
+        query = LotteryDAO._eligible_pool_query("$1", weight_sql, group_fields, term_exclusive)
+        row = await Database.fetchrow(conn, query, event_id)
+        return LotteryDAO._to_draw_pool(row, weight_sql is not None, group_fields)
+
+    @staticmethod
+    async def get_eligible_pools(conn, events, group_fields_by_event, term_exclusive=False):
+        """Get the draw pools of many events in a single query (see get_eligible_pool)
+
+        The pool query runs once per event through a LATERAL join, so each event keeps the plan of a single pool
+        load instead of one large sort over every event's participants. Each event is weighted by its own
+        draw_weight and only gets the group codes of its own quota fields, so every pool is identical to the one
+        get_eligible_pool would load.
+
+        Returns:
+            {event_id: DrawPool}
+        """
+        if not events:
+            return {}
+        weight_cases = " ".join(f"WHEN '{draw_weight}' THEN {weight_sql}"
+                                for draw_weight, weight_sql in _DRAW_WEIGHT_SQL.items() if weight_sql)
+        all_fields = sorted({field for fields in group_fields_by_event.values() for field in fields})
+        pool_query = LotteryDAO._eligible_pool_query("ids.event_id", f"CASE e.draw_weight {weight_cases} END",
+                                                     all_fields, term_exclusive)
+        query = f"""
+        SELECT ids.event_id, pools.*
+        FROM unnest($1::varchar[]) AS ids(event_id)
+        CROSS JOIN LATERAL ({pool_query}) pools
+        """
+        rows = {row['event_id']: row
+                for row in await Database.fetch(conn, query, [event['id'] for event in events])}
+        return {
+            event['id']: LotteryDAO._to_draw_pool(rows[event['id']], _DRAW_WEIGHT_SQL[event['draw_weight']] is not None,
+                                                  group_fields_by_event.get(event['id'], ()))
+            for event in events
+        }
+
+    @staticmethod
+    def _to_draw_participant(row):
+        """Flatten a participant row into the (privacy masked) shape returned by the draw"""
+        meta = LotteryDAO._parse_meta(row['meta'])
+        student_info = meta.get('student_info', {})
+        teaching_comments = meta.get('teaching_comments', {})
+        oracle_info = meta.get('oracle_info', {})
+        
+        # Prioritize Oracle name data over student_info name
+        display_name = (
+            oracle_info.get('name') or 
+            oracle_info.get('chinese_name') or 
+            oracle_info.get('english_name') or 
+            student_info.get('name', '')
+        )
         
+        participant = {
+            'participant_id': row['participant_id'],
+            'event_id': row['event_id'],
+            'created_at': row['created_at'],
+            'student_id': student_info.get('id', ''),
+            'department': student_info.get('department', ''),
+            'name': display_name,
+            'grade': student_info.get('grade', ''),
+            'required_surveys': teaching_comments.get('required_surveys'),
+            'completed_surveys': teaching_comments.get('completed_surveys'),
+            'surveys_completed': teaching_comments.get('surveys_completed'),
+            'valid_surveys': teaching_comments.get('valid_surveys'),
+            # Oracle data - only include necessary fields for frontend
+            'oracle_student_id': oracle_info.get('student_id', ''),
+            'chinese_name': oracle_info.get('chinese_name', ''),
+            'english_name': oracle_info.get('english_name', ''),
+        }
+        # 應用個資遮罩
+        return apply_privacy_mask(participant)
+
+    @staticmethod
+    async def get_draw_participants(conn, participant_ids):
+        """Get the (privacy masked) rows of the given participants, keyed by participant ID"""
+        if not participant_ids:
+            return {}
+
         query = """
         SELECT p.id as participant_id, p.event_id, p.meta, p.created_at
         FROM lottery_participants p
-        LEFT JOIN lottery_winners w ON p.id = w.participant_id AND w.event_id = p.event_id
-        WHERE p.event_id = $1 AND w.id IS NULL
+        WHERE p.id = ANY($1::int[])
+        """
+        rows = await Database.fetch(conn, query, list(participant_ids))
+        return {row['participant_id']: LotteryDAO._to_draw_participant(row) for row in rows}
+
+    @staticmethod
+    async def save_alternates(conn, event_id, prize_ids, participant_ids, ranks):
+        """Bulk insert ranked alternates of a draw"""
+        query = """
+        INSERT INTO lottery_alternates (event_id, prize_id, participant_id, rank)
+        SELECT $1, a.prize_id, a.participant_id, a.rank
+        FROM unnest($2::int[], $3::int[], $4::int[]) AS a(prize_id, participant_id, rank)
+        """
+        await Database.execute(conn, query, event_id, list(prize_ids), list(participant_ids), list(ranks))
+
+    @staticmethod
+    async def get_alternates(conn, event_id):
+        """Get the remaining alternates of an event, by prize and rank"""
+        query = """
+        SELECT a.id AS alternate_id, a.prize_id, pr.name AS prize_name, a.rank,
+               p.id AS participant_id, p.event_id, p.meta, p.created_at
+        FROM lottery_alternates a
+        JOIN lottery_prizes pr ON pr.id = a.prize_id
+        JOIN lottery_participants p ON p.id = a.participant_id
+        WHERE a.event_id = $1
+        ORDER BY a.prize_id, a.rank
         """
         rows = await Database.fetch(conn, query, event_id)
-        
-        # Transform the data to flatten meta information and filter for eligibility
-        participants = []
-        for row in rows:
-            meta = LotteryDAO._parse_meta(row['meta'])
-            student_info = meta.get('student_info', {})
-            teaching_comments = meta.get('teaching_comments', {})
-            oracle_info = meta.get('oracle_info', {})
-            
-            # Prioritize Oracle name data over student_info name
-            display_name = (
-                oracle_info.get('name') or 
-                oracle_info.get('chinese_name') or 
-                oracle_info.get('english_name') or 
-                student_info.get('name', '')
-            )
-            
-            # Check eligibility based on event type
-            is_eligible = True
-            
-            # Check if participant has a valid name - skip if no name available
-            if not display_name or display_name.strip() == '':
-                is_eligible = False
-            
-            if event and event['type'] == 'final_teaching':
-                # For final_teaching events, both surveys_completed and valid_surveys must be "Y"
-                surveys_completed = teaching_comments.get('surveys_completed')
-                valid_surveys = teaching_comments.get('valid_surveys')
-                
-                if surveys_completed != "Y" or valid_surveys != "Y":
-                    is_eligible = False
-            
-            # Only include eligible participants in the drawing pool
-            if not is_eligible:
-                continue
-            
-            participant = {
-                'participant_id': row['participant_id'],
-                'event_id': row['event_id'],
-                'created_at': row['created_at'],
-                'student_id': student_info.get('id', ''),
-                'department': student_info.get('department', ''),
-                'name': display_name,
-                'grade': student_info.get('grade', ''),
-                'required_surveys': teaching_comments.get('required_surveys'),
-                'completed_surveys': teaching_comments.get('completed_surveys'),
-                'surveys_completed': teaching_comments.get('surveys_completed'),
-                'valid_surveys': teaching_comments.get('valid_surveys'),
-                # Oracle data - only include necessary fields for frontend
-                'oracle_student_id': oracle_info.get('student_id', ''),
-                'chinese_name': oracle_info.get('chinese_name', ''),
-                'english_name': oracle_info.get('english_name', ''),
-            }
-            # 應用個資遮罩
-            participant = apply_privacy_mask(participant)
-            participants.append(participant)
-        
-        return participants
+        return [{**LotteryDAO._to_draw_participant(row), 'alternate_id': row['alternate_id'],
+                 'prize_id': row['prize_id'], 'prize_name': row['prize_name'], 'rank': row['rank']}
+                for row in rows]
+
+    @staticmethod
+    async def promote_alternate(conn, event_id, winner_id):
+        """Replace a winner with the next ranked alternate of the same prize in a single statement
+
+        Nothing changes (and None is returned) when the winner doesn't exist or the prize has no alternates left.
+        """
+        query = f"""
+        WITH target AS (
+            SELECT id, prize_id, participant_id
+            FROM lottery_winners
+            WHERE id = $2 AND event_id = $1
+        ), next_alternate AS (
+            SELECT a.id, a.prize_id, a.participant_id, a.rank
+            FROM lottery_alternates a
+            JOIN target t ON t.prize_id = a.prize_id
+            ORDER BY a.rank
+            LIMIT 1
+            FOR UPDATE OF a
+        ), removed AS (
+            DELETE FROM lottery_winners w
+            USING target t, next_alternate n
+            WHERE w.id = t.id
+            RETURNING w.id, w.participant_id
+        ), used AS (
+            DELETE FROM lottery_alternates a
+            USING next_alternate n
+            WHERE a.id = n.id
+        ), inserted AS (
+            {_insert_winners_sql("next_alternate w")}
+        )
+        SELECT i.id, i.event_id, i.prize_id, i.participant_id, i.created_at,
+               r.id AS replaced_winner_id, r.participant_id AS replaced_participant_id, n.rank AS alternate_rank
+        FROM inserted i, removed r, next_alternate n
+        """
+        result = await Database.fetchrow(conn, query, event_id, winner_id)
+        if result:
+            await InvalidationBus.publish(conn, 'winners', event_id)
+            await LotteryDAO.bump_event_version(conn, event_id)
+        return result
+
+    @staticmethod
+    async def winner_exists(conn, event_id, winner_id):
+        """Check if a winner belongs to an event"""
+        query = """
+        SELECT EXISTS (
+            SELECT 1 FROM lottery_winners
+            WHERE id = $2 AND event_id = $1
+        )
+        """
+        return await Database.fetchval(conn, query, event_id, winner_id)
 
     @staticmethod
     async def delete_winners(conn, event_id):
-        """Delete all winners for an event"""
+        """Delete all winners (and alternates) for an event"""
         query = """
+        WITH deleted_alternates AS (
+            DELETE FROM lottery_alternates
+            WHERE event_id = $1
+        )
         DELETE FROM lottery_winners
         WHERE event_id = $1
         RETURNING id
         """
-        return await Database.fetch(conn, query, event_id)
+        result = await Database.fetch(conn, query, event_id)
+        await InvalidationBus.publish(conn, 'winners', event_id)
+        await LotteryDAO.bump_event_version(conn, event_id)
+        return result
 
     @staticmethod
     async def delete_participant(conn, participant_id):
@@ -703,7 +1477,11 @@ class LotteryDAO:
         WHERE id = $1
         RETURNING id, event_id
         """
-        return await Database.fetchrow(conn, query, participant_id)
+        result = await Database.fetchrow(conn, query, participant_id)
+        if result:
+            await InvalidationBus.publish(conn, 'participants', result['event_id'])
+            await LotteryDAO.bump_event_version(conn, result['event_id'])
+        return result
 
     @staticmethod
     async def delete_all_participants(conn, event_id):
@@ -713,35 +1491,44 @@ class LotteryDAO:
         WHERE event_id = $1
         RETURNING id
         """
-        return await Database.fetch(conn, query, event_id)
+        result = await Database.fetch(conn, query, event_id)
+        await InvalidationBus.publish(conn, 'participants', event_id)
+        await LotteryDAO.bump_event_version(conn, event_id)
+        return result
 
     @staticmethod
     async def soft_delete_event(conn, event_id):
         """Soft delete a lottery event by setting is_deleted to TRUE"""
-        query = """
+        query = f"""
         UPDATE lottery_events
         SET is_deleted = TRUE
         WHERE id = $1 AND is_deleted = FALSE
-        RETURNING id, academic_year_term, name, description, event_date, type, status, is_deleted, created_at
+        RETURNING {_EVENT_COLUMNS}
         """
-        return await Database.fetchrow(conn, query, event_id)
+        result = await Database.fetchrow(conn, query, event_id)
+        await InvalidationBus.publish(conn, 'event', event_id)
+        await LotteryDAO.bump_event_version(conn, event_id)
+        return result
 
     @staticmethod
     async def restore_event(conn, event_id):
         """Restore a soft deleted lottery event by setting is_deleted to FALSE"""
-        query = """
+        query = f"""
         UPDATE lottery_events
         SET is_deleted = FALSE
         WHERE id = $1 AND is_deleted = TRUE
-        RETURNING id, academic_year_term, name, description, event_date, type, status, is_deleted, created_at
+        RETURNING {_EVENT_COLUMNS}
         """
-        return await Database.fetchrow(conn, query, event_id)
+        result = await Database.fetchrow(conn, query, event_id)
+        await InvalidationBus.publish(conn, 'event', event_id)
+        await LotteryDAO.bump_event_version(conn, event_id)
+        return result
 
     @staticmethod
     async def get_deleted_events(conn, limit=100, offset=0):
         """Get all soft deleted lottery events with pagination"""
-        query = """
-        SELECT id, academic_year_term, name, description, event_date, type, status, is_deleted, created_at
+        query = f"""
+        SELECT {_EVENT_COLUMNS}
         FROM lottery_events
         WHERE is_deleted = TRUE
         ORDER BY created_at DESC
@@ -4,6 +4,7 @@ from typing import Dict, Any
 from lottery_api.data_access_object.db import get_db_connection
 from lottery_api.business_model.email_business import EmailBusiness
 from lottery_api.lib.auth_library.permission import depend_auth, Auth
+from lottery_api.lib.idempotency import IdempotentRequest, depend_idempotency
 from lottery_api.lib.response import ExceptionResponse, SingleResponse, to_json_response
 from lottery_api.schema.email import (
     SendEmailRequest, SendEmailResponse, BulkEmailRequest,
@@ -54,19 +55,23 @@ async def send_winners_notification(
         event_id: str,
         request: SendWinnersEmailRequest,
         auth: Auth = depend_auth(),
+        idempotency: IdempotentRequest = depend_idempotency(),
         conn=Depends(get_db_connection)
 ):
-    """發送中獎通知郵件給抽獎活動的中獎者"""
-    result = await EmailBusiness.send_winners_notification(
-        conn=conn,
-        event_id=event_id,
-        email_config=request.email_config,
-        sender_name=request.sender_name,
-        subject=request.subject,
-        email_template=request.email_template,
-        html_template=request.html_template
-    )
-    return to_json_response(SingleResponse(result=result))
+    """發送中獎通知郵件給抽獎活動的中獎者（帶相同 Idempotency-Key 的重試會直接取得第一次的結果，不會重複寄信）"""
+    async def send_winners():
+        result = await EmailBusiness.send_winners_notification(
+            conn=conn,
+            event_id=event_id,
+            email_config=request.email_config,
+            sender_name=request.sender_name,
+            subject=request.subject,
+            email_template=request.email_template,
+            html_template=request.html_template
+        )
+        return to_json_response(SingleResponse(result=result))
+
+    return await idempotency.run(conn, send_winners)
 
 
 @router.post("/test-connection", response_model=SingleResponse[Dict[str, Any]], status_code=status.HTTP_200_OK)
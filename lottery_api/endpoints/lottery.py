@@ -1,19 +1,28 @@
 import os
+from datetime import datetime
 from typing import List, Optional, Union
 from urllib.parse import quote
-from fastapi import APIRouter, Depends, status, File, UploadFile, Query, HTTPException, Path
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, status, File, UploadFile, Query, HTTPException, Path, Header, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from lottery_api.data_access_object.db import get_db_connection
 from lottery_api.business_model.lottery_business import LotteryBusiness
+from lottery_api.business_model.results_bundle import ResultsBundle
+from lottery_api.config import get_settings
+from lottery_api.lib.base_exception import ResourceNotFoundException
 from lottery_api.lib.auth_library.permission import depend_auth, Auth
-from lottery_api.lib.response import ExceptionResponse, SingleResponse, ListResponse, to_json_response
+from lottery_api.lib.idempotency import IdempotentRequest, depend_idempotency
+from lottery_api.lib.response import ExceptionResponse, SingleResponse, ListResponse, etag_matches, \
+    not_modified_response, to_json_response, version_etag
 from lottery_api.schema.lottery import (
     LotteryEventCreate, LotteryEvent, LotteryEventType, LotteryEventUpdate,
     StudentImport, StudentsImport, FinalTeachingStudentsImport, ParticipantList,
     PrizeCreate, PrizeSettings, PrizeList, Prize, PrizeUpdate,
     DrawRequest, WinnersList, ExportWinnersResponse, FinalParticipantList, ResetDrawingResponse,
     DeleteParticipantResponse, DeleteAllParticipantsResponse, ImportStudentsResponse,
-    SoftDeleteEventResponse
+    SoftDeleteEventResponse, EventSummary, LotteryEventWithCounts, DrawOptions, DrawAudit,
+    AlternatesByPrize, PromoteAlternateResponse, RedrawRequest, RedrawnPrize,
+    DrawRoundRequest, DrawRoundResponse, EventRounds, BatchDrawRequest, BatchDrawResult, ScheduledDraw,
+    StudentResult
 )
 
 router = APIRouter(prefix="/lottery", tags=["lottery"])
@@ -30,17 +39,36 @@ async def create_lottery_event(
     return to_json_response(SingleResponse(result=result))
 
 
-@router.get("/events", response_model=ListResponse[LotteryEvent])
+@router.get("/events", response_model=ListResponse[LotteryEventWithCounts],
+            responses={304: {'description': 'Not Modified - Nothing changed since the If-None-Match ETag'},
+                       400: {'model': ExceptionResponse, 'description': 'Bad Request - Incomplete keyset cursor'}})
 async def get_lottery_events(
         limit: int = Query(100, ge=1, le=1000),
         offset: int = Query(0, ge=0),
         event_type: Optional[LotteryEventType] = None,
+        include_counts: bool = Query(False, description="Include participant, prize and winner counts"),
+        after_created_at: Optional[datetime] = Query(None, description="created_at of the last event on the previous page"),
+        after_id: Optional[str] = Query(None, description="id of the last event on the previous page"),
+        if_none_match: Optional[str] = Header(None),
         auth: Auth = depend_auth(),
         conn=Depends(get_db_connection)
 ):
-    """Get all lottery events with pagination"""
-    result = await LotteryBusiness.get_lottery_events(conn, limit, offset, event_type.value if event_type else None)
-    return to_json_response(ListResponse(result=result))
+    """Get all lottery events with pagination.
+
+    Pass both `after_created_at` and `after_id` from the last event of the previous page for keyset pagination
+    (`offset` is ignored then); passing only one of them is a 400. Set `include_counts=true` to add participant, prize and winner counts.
+    Send the returned ETag in If-None-Match to get a 304 while no event has changed.
+    """
+    etag = version_etag(await LotteryBusiness.get_events_version(conn), limit, offset, event_type,
+                        include_counts, after_created_at, after_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
+    result = await LotteryBusiness.get_lottery_events(
+        conn, limit, offset, event_type.value if event_type else None,
+        include_counts=include_counts, after_created_at=after_created_at, after_id=after_id
+    )
+    return to_json_response(ListResponse(result=result), etag=etag)
 
 
 @router.get("/events/{event_id}", response_model=SingleResponse[LotteryEvent],
@@ -55,6 +83,18 @@ async def get_lottery_event(
     return to_json_response(SingleResponse(result=result))
 
 
+@router.get("/events/{event_id}/summary", response_model=SingleResponse[EventSummary],
+            responses={404: {'model': ExceptionResponse}})
+async def get_event_summary(
+        event_id: str,
+        auth: Auth = depend_auth(),
+        conn=Depends(get_db_connection)
+):
+    """Get a lottery event together with its prizes, per-prize fill status and participant/eligible/winner counts"""
+    result = await LotteryBusiness.get_event_summary(conn, event_id)
+    return to_json_response(SingleResponse(result=result))
+
+
 @router.put("/events/{event_id}", response_model=SingleResponse[LotteryEvent],
            responses={
                404: {'model': ExceptionResponse},
@@ -73,36 +113,72 @@ async def update_lottery_event(
 
 @router.post("/events/{event_id}/participants", response_model=SingleResponse[ImportStudentsResponse], 
              status_code=status.HTTP_201_CREATED,
-             responses={404: {'model': ExceptionResponse}})
+             responses={404: {'model': ExceptionResponse},
+                        409: {'model': ExceptionResponse,
+                              'description': 'Conflict - The event is being drawn or modified by another request'}})
 async def import_students_and_add_participants(
         event_id: str,
         request: Union[StudentsImport, FinalTeachingStudentsImport],
         auth: Auth = depend_auth(),
+        idempotency: IdempotentRequest = depend_idempotency(),
         conn=Depends(get_db_connection)
 ):
     """Import students and add them as participants to a lottery event.
     
     For general events: Use StudentsImport format - Oracle database will be queried for additional student info.
     For final_teaching events: Use FinalTeachingStudentsImport format - Complete student info should be provided.
+    Retries sent with the same Idempotency-Key header get the first response back without importing again.
     """
-    result = await LotteryBusiness.import_students_and_add_participants(
-        conn, event_id, [student.dict() for student in request.students]
-    )
-    return to_json_response(SingleResponse(result=result))
+    async def import_students():
+        result = await LotteryBusiness.import_students_and_add_participants(
+            conn, event_id, [student.dict() for student in request.students]
+        )
+        return to_json_response(SingleResponse(result=result))
+
+    return await idempotency.run(conn, import_students)
 
 
 @router.get("/events/{event_id}/participants", response_model=SingleResponse[ParticipantList],
-            responses={404: {'model': ExceptionResponse}})
+            responses={
+                304: {'description': 'Not Modified - Nothing changed since the If-None-Match ETag'},
+                404: {'model': ExceptionResponse}
+            })
 async def get_participants(
         event_id: str,
         limit: int = Query(1000, ge=1, le=10000),
         offset: int = Query(0, ge=0),
+        if_none_match: Optional[str] = Header(None),
         auth: Auth = depend_auth(),
         conn=Depends(get_db_connection)
 ):
-    """Get participants for a lottery event"""
+    """Get participants for a lottery event. Send the returned ETag in If-None-Match to get a 304 while the
+    event is unchanged."""
+    etag = version_etag(await LotteryBusiness.get_event_version(conn, event_id), limit, offset)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
     result = await LotteryBusiness.get_participants(conn, event_id, limit, offset)
-    return to_json_response(SingleResponse(result=result))
+    return to_json_response(SingleResponse(result=result), etag=etag)
+
+
+@router.get("/events/{event_id}/participants/stream",
+            responses={
+                200: {'content': {'application/x-ndjson': {}},
+                      'description': 'Every participant of the event, one JSON object per line'},
+                404: {'model': ExceptionResponse}
+            })
+async def stream_participants(
+        event_id: str = Path(),
+        auth: Auth = depend_auth(),
+        conn=Depends(get_db_connection)
+):
+    """Stream all participants of a lottery event as NDJSON (one participant per line, ordered by id).
+
+    Rows are read through a server-side cursor and sent as they are fetched, so whole rosters can be
+    exported without paging and without the server holding the full list in memory.
+    """
+    chunks = await LotteryBusiness.stream_participants(conn, event_id)
+    return StreamingResponse(chunks, media_type="application/x-ndjson")
 
 
 @router.post("/events/{event_id}/prizes", response_model=ListResponse[Prize],
@@ -119,15 +195,24 @@ async def set_prizes(
 
 
 @router.get("/events/{event_id}/prizes", response_model=SingleResponse[PrizeList],
-            responses={404: {'model': ExceptionResponse}})
+            responses={
+                304: {'description': 'Not Modified - Nothing changed since the If-None-Match ETag'},
+                404: {'model': ExceptionResponse}
+            })
 async def get_prizes(
         event_id: str,
+        if_none_match: Optional[str] = Header(None),
         auth: Auth = depend_auth(),
         conn=Depends(get_db_connection)
 ):
-    """Get prizes for a lottery event"""
+    """Get prizes for a lottery event. Send the returned ETag in If-None-Match to get a 304 while the event
+    is unchanged."""
+    etag = version_etag(await LotteryBusiness.get_event_version(conn, event_id))
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+
     result = await LotteryBusiness.get_prizes(conn, event_id)
-    return to_json_response(SingleResponse(result=result))
+    return to_json_response(SingleResponse(result=result), etag=etag)
 
 
 @router.put("/prizes/{prize_id}", response_model=SingleResponse[Prize], responses={404: {'model': ExceptionResponse}})
@@ -153,39 +238,222 @@ async def delete_prize(
     return to_json_response(SingleResponse(result=result))
 
 
+@router.post("/events/batch-draw", response_model=ListResponse[BatchDrawResult])
+async def draw_events(
+        request: BatchDrawRequest,
+        auth: Auth = depend_auth(),
+        conn=Depends(get_db_connection)
+):
+    """Draw many lottery events at once (e.g. every course evaluation event of a term).
+
+    Events are drawn concurrently and independently: the response has one result per event, in request order,
+    with either its winners by prize or the error that prevented its draw.
+    """
+    result = await LotteryBusiness.draw_events(conn, request)
+    return to_json_response(ListResponse(result=result))
+
+
 @router.post("/events/{event_id}/draw", response_model=ListResponse[WinnersList],
              responses={
                  404: {'model': ExceptionResponse},
                  400: {'model': ExceptionResponse,
-                       'description': 'Bad Request - Event already drawn or other parameter violation'}
+                       'description': 'Bad Request - Event already drawn or other parameter violation'},
+                 409: {'model': ExceptionResponse,
+                       'description': 'Conflict - The event is being drawn or modified by another request'}
              })
 async def draw_winners(
+        event_id: str = Path(),
+        request: Optional[DrawOptions] = None,
+        auth: Auth = depend_auth(),
+        idempotency: IdempotentRequest = depend_idempotency(),
+        conn=Depends(get_db_connection)
+):
+    """Draw winners for a lottery event. An event can only be drawn once.
+
+    Pass a seed (e.g. a value committed before the draw) to make the draw reproducible; otherwise a random
+    seed is generated. The seed and pool snapshot hash are stored on the event and in the draw audit.
+    Retries sent with the same Idempotency-Key header get the winners of the first draw back.
+    """
+    async def draw():
+        result = await LotteryBusiness.draw_winners(conn, event_id, request)
+        return to_json_response(ListResponse(result=result))
+
+    return await idempotency.run(conn, draw)
+
+
+@router.post("/events/{event_id}/rounds", response_model=SingleResponse[DrawRoundResponse],
+             responses={
+                 404: {'model': ExceptionResponse},
+                 400: {'model': ExceptionResponse,
+                       'description': 'Bad Request - Prizes already drawn or other parameter violation'},
+                 409: {'model': ExceptionResponse,
+                       'description': 'Conflict - The event is being drawn or modified by another request'}
+             })
+async def draw_round(
+        request: DrawRoundRequest,
+        event_id: str = Path(),
+        auth: Auth = depend_auth(),
+        conn=Depends(get_db_connection)
+):
+    """Draw one named round of a live ceremony: the given prizes, against the participants who haven't won yet.
+    The event stays in_progress until every prize has been drawn."""
+    result = await LotteryBusiness.draw_round(conn, event_id, request)
+    return to_json_response(SingleResponse(result=result))
+
+
+@router.get("/events/{event_id}/rounds", response_model=SingleResponse[EventRounds],
+            responses={404: {'model': ExceptionResponse}})
+async def get_rounds(
         event_id: str = Path(),
         auth: Auth = depend_auth(),
         conn=Depends(get_db_connection)
 ):
-    """Draw winners for a lottery event. An event can only be drawn once."""
-    result = await LotteryBusiness.draw_winners(conn, event_id)
+    """Get the drawn rounds of a lottery event and the prizes that are still to be drawn"""
+    result = await LotteryBusiness.get_rounds(conn, event_id)
+    return to_json_response(SingleResponse(result=result))
+
+
+@router.post("/events/{event_id}/redraw", response_model=ListResponse[RedrawnPrize],
+             responses={
+                 404: {'model': ExceptionResponse},
+                 400: {'model': ExceptionResponse,
+                       'description': 'Bad Request - Event not drawn or other parameter violation'},
+                 409: {'model': ExceptionResponse,
+                       'description': 'Conflict - The event is being drawn or modified by another request'}
+             })
+async def redraw_prizes(
+        request: RedrawRequest,
+        event_id: str = Path(),
+        auth: Auth = depend_auth(),
+        conn=Depends(get_db_connection)
+):
+    """Re-draw some prizes of a drawn event. Current winners of every prize are excluded from the new draw,
+    and the winners of the other prizes are kept."""
+    result = await LotteryBusiness.redraw_prizes(conn, event_id, request)
     return to_json_response(ListResponse(result=result))
 
 
-@router.get("/events/{event_id}/winners", response_model=ListResponse[WinnersList],
+@router.get("/events/{event_id}/draw-audit", response_model=SingleResponse[DrawAudit],
             responses={404: {'model': ExceptionResponse}})
+async def get_draw_audit(
+        event_id: str = Path(),
+        auth: Auth = depend_auth(),
+        conn=Depends(get_db_connection)
+):
+    """Get the seed, pool snapshot and drawn IDs of the latest draw, verified by replaying the draw"""
+    result = await LotteryBusiness.get_draw_audit(conn, event_id)
+    return to_json_response(SingleResponse(result=result))
+
+
+@router.get("/events/{event_id}/winners", response_model=ListResponse[WinnersList],
+            responses={
+                304: {'description': 'Not Modified - The winners still match the If-None-Match ETag'},
+                404: {'model': ExceptionResponse}
+            })
 async def get_winners(
         event_id: str,
+        if_none_match: Optional[str] = Header(None),
+        auth: Auth = depend_auth(),
+        conn=Depends(get_db_connection)
+):
+    """Get winners for a lottery event.
+
+    The response is the winners document stored when the draw committed, served with a strong ETag;
+    send it back in If-None-Match to get a 304 while the winners are unchanged.
+    """
+    snapshot = await LotteryBusiness.get_winners_snapshot(conn, event_id)
+    headers = {"ETag": f'"{snapshot["etag"]}"', "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=snapshot['document'], media_type="application/json", headers=headers)
+
+
+@router.get("/events/{event_id}/results", response_model=ListResponse[WinnersList],
+            responses={
+                304: {'description': 'Not Modified - The file still matches the If-None-Match ETag'},
+                404: {'model': ExceptionResponse, 'description': 'No results have been published for the event'}
+            })
+async def get_results_bundle(
+        event_id: str = Path(),
+        accept_encoding: Optional[str] = Header(None),
+        if_none_match: Optional[str] = Header(None)
+):
+    """Get the published (masked) winners of a drawn event. No login is required.
+
+    Served from the pre-rendered results file written when the draw committed (requires results_bundle_enabled),
+    gzipped when the client accepts it, with public cache headers.
+    """
+    bundle = ResultsBundle.find(event_id, accept_gzip="gzip" in (accept_encoding or ""))
+    if bundle is None:
+        raise ResourceNotFoundException(message=f"No results have been published for lottery event {event_id}")
+
+    file_path, stat_result, gzipped = bundle
+    headers = {
+        "Cache-Control": f"public, max-age={get_settings().results_bundle_max_age_seconds}",
+        "Vary": "Accept-Encoding"
+    }
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    response = FileResponse(file_path, stat_result=stat_result, media_type="application/json", headers=headers)
+    if etag_matches(if_none_match, response.headers["etag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                        headers={"ETag": response.headers["etag"], "Cache-Control": headers["Cache-Control"],
+                                 "Vary": "Accept-Encoding"})
+    return response
+
+
+@router.get("/events/{event_id}/results/{student_id}", response_model=SingleResponse[StudentResult],
+            responses={404: {'model': ExceptionResponse}})
+async def get_student_result(
+        event_id: str = Path(),
+        student_id: str = Path(min_length=1, max_length=50)
+):
+    """Check whether a student won a lottery event. No login is required, so students can check their own
+    result; only whether they won and the prize name are returned.
+
+    Served from an in-memory index of the winning student IDs, without a database connection per request.
+    """
+    result = await LotteryBusiness.get_student_result(event_id, student_id.strip())
+    return to_json_response(SingleResponse(result=result))
+
+
+@router.get("/events/{event_id}/alternates", response_model=ListResponse[AlternatesByPrize],
+            responses={404: {'model': ExceptionResponse}})
+async def get_alternates(
+        event_id: str = Path(),
         auth: Auth = depend_auth(),
         conn=Depends(get_db_connection)
 ):
-    """Get winners for a lottery event"""
-    result = await LotteryBusiness.get_winners(conn, event_id)
+    """Get the remaining ranked alternates of a lottery event, by prize"""
+    result = await LotteryBusiness.get_alternates(conn, event_id)
     return to_json_response(ListResponse(result=result))
 
 
+@router.post("/events/{event_id}/winners/{winner_id}/promote", response_model=SingleResponse[PromoteAlternateResponse],
+             responses={
+                 404: {'model': ExceptionResponse},
+                 400: {'model': ExceptionResponse, 'description': 'Bad Request - No alternates left for the prize'},
+                 409: {'model': ExceptionResponse,
+                       'description': 'Conflict - The event is being drawn or modified by another request'}
+             })
+async def promote_alternate(
+        event_id: str = Path(),
+        winner_id: int = Path(),
+        auth: Auth = depend_auth(),
+        conn=Depends(get_db_connection)
+):
+    """Replace a winner with the next ranked alternate of the same prize, leaving the other winners untouched"""
+    result = await LotteryBusiness.promote_alternate(conn, event_id, winner_id)
+    return to_json_response(SingleResponse(result=result))
+
+
 @router.delete("/events/{event_id}/winners", response_model=SingleResponse[ResetDrawingResponse],
                responses={
                    404: {'model': ExceptionResponse},
                    400: {'model': ExceptionResponse,
-                         'description': 'Bad Request - Event has no winners or other parameter violation'}
+                         'description': 'Bad Request - Event has no winners or other parameter violation'},
+                   409: {'model': ExceptionResponse,
+                         'description': 'Conflict - The event is being drawn or modified by another request'}
                })
 async def reset_drawing(
         event_id: str = Path(),
@@ -264,7 +532,9 @@ async def download_export(
 @router.delete("/participants/{participant_id}", response_model=SingleResponse[DeleteParticipantResponse],
                responses={
                    404: {'model': ExceptionResponse},
-                   400: {'model': ExceptionResponse, 'description': 'Bad Request - Event already drawn or other parameter violation'}
+                   400: {'model': ExceptionResponse, 'description': 'Bad Request - Event already drawn or other parameter violation'},
+                   409: {'model': ExceptionResponse,
+                         'description': 'Conflict - The event is being drawn or modified by another request'}
                })
 async def delete_participant(
         participant_id: int = Path(),
@@ -279,7 +549,9 @@ async def delete_participant(
 @router.delete("/events/{event_id}/participants", response_model=SingleResponse[DeleteAllParticipantsResponse],
                responses={
                    404: {'model': ExceptionResponse},
-                   400: {'model': ExceptionResponse, 'description': 'Bad Request - Event already drawn or other parameter violation'}
+                   400: {'model': ExceptionResponse, 'description': 'Bad Request - Event already drawn or other parameter violation'},
+                   409: {'model': ExceptionResponse,
+                         'description': 'Conflict - The event is being drawn or modified by another request'}
                })
 async def delete_all_participants(
         event_id: str = Path(),
@@ -321,6 +593,17 @@ async def restore_event(
     return to_json_response(SingleResponse(result=result))
 
 
+@router.get("/scheduled-draws", response_model=ListResponse[ScheduledDraw])
+async def get_scheduled_draws(
+        limit: int = Query(100, ge=1, le=1000),
+        auth: Auth = depend_auth(),
+        conn=Depends(get_db_connection)
+):
+    """Get the auto_draw events with the state of their scheduled draw (lease owner, attempts, last error)"""
+    result = await LotteryBusiness.get_scheduled_draws(conn, limit)
+    return to_json_response(ListResponse(result=result))
+
+
 @router.get("/deleted-events", response_model=ListResponse[LotteryEvent])
 async def get_deleted_events(
         limit: int = Query(100, ge=1, le=1000),
@@ -0,0 +1,173 @@
+import zlib
+from typing import Callable, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types worth compressing; anything else (Excel exports, images, ...) is sent as is
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript",
+                      "application/xml", "application/problem+json")
+
+
+class _Compressor:
+    """Incremental compressor of one response body: compress() for a chunk, finish() for the end"""
+
+    def __init__(self, compress: Callable[[bytes], bytes], flush: Callable[[], bytes], finish: Callable[[], bytes]):
+        self._compress = compress
+        self._flush = flush
+        self.finish = finish
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        chunk = self._compress(data)
+        return chunk + self._flush() if flush else chunk
+
+
+def _gzip_compressor(level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return _Compressor(compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush)
+
+
+def _brotli_compressor(quality):
+    compressor = brotli.Compressor(quality=quality)
+    return _Compressor(compressor.process, compressor.flush, compressor.finish)
+
+
+def _zstd_compressor(level):
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return _Compressor(compressor.compress, lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+                       compressor.flush)
+
+
+class CompressionMiddleware:
+    """Compress response bodies with the best encoding the client accepts: zstd or br (when the zstandard /
+    brotli packages are installed), then gzip
+
+    Bodies smaller than minimum_size are sent as is. Streamed responses are compressed chunk by chunk and
+    flushed after every chunk, so streamed rows still arrive as they are produced. Responses that already have
+    a Content-Encoding (e.g. the pre-gzipped results bundles) and non-text content types pass through untouched.
+    Strong ETags become weak on compressed responses, which If-None-Match still matches.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        # Preferred first
+        self.compressors: Dict[str, Callable[[], _Compressor]] = {}
+        if zstandard is not None:
+            self.compressors["zstd"] = lambda: _zstd_compressor(zstd_level)
+        if brotli is not None:
+            self.compressors["br"] = lambda: _brotli_compressor(brotli_quality)
+        self.compressors["gzip"] = lambda: _gzip_compressor(gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self.compressors[encoding], self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """The preferred available encoding among those the Accept-Encoding header allows (q > 0)"""
+        accepted = {}
+        for item in accept_encoding.split(","):
+            name, _, params = item.strip().partition(";")
+            quality = 1.0
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if key == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if name:
+                accepted[name.strip().lower()] = quality
+        for encoding in self.compressors:
+            if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return None
+
+
+class _CompressionResponder:
+    """Wraps the send of one response and compresses its body when it qualifies"""
+
+    def __init__(self, send: Send, encoding: str, compressor_factory: Callable[[], _Compressor], minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.compressor_factory = compressor_factory
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Held back until the first body message tells whether (and how) the body is compressed
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            # Including http.response.pathsend of file responses
+            if self.start_message is not None and not self.passthrough:
+                await self._send(self.start_message)
+                self.passthrough = True
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+            self.compressor = self.compressor_factory()
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            if more_body:
+                del headers["Content-Length"]
+                await self._send(self.start_message)
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+
+        if more_body:
+            chunk = self.compressor.compress(body, flush=True)
+        else:
+            chunk = self.compressor.compress(body) + self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
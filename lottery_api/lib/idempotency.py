@@ -0,0 +1,76 @@
+import hashlib
+from typing import Awaitable, Callable, Optional
+
+import asyncpg
+from fastapi import Depends, Header, Request, Response
+
+from lottery_api.config import get_settings
+from lottery_api.data_access_object.idempotency_dao import IdempotencyDAO
+from lottery_api.lib.base_exception import ParameterViolationException, RestrictionException
+
+# First key of the idempotency advisory locks (see EventLock for the event locks)
+LOCK_NAMESPACE = 0x49444D50  # "IDMP"
+
+
+class IdempotentRequest:
+    """A POST request that may carry an ``Idempotency-Key`` header
+
+    The first request with a key runs normally and its successful (2xx) response is stored with the fingerprint of
+    the request. Retries with the same key get the stored response back without running the work again, and a retry
+    that arrives while the first attempt is still running waits for it: the attempt holds a per-key Postgres advisory
+    lock, so this holds across workers and nodes. Failed requests are not stored, so they can be retried.
+    """
+
+    def __init__(self, key: Optional[str], fingerprint: str):
+        self.key = key
+        self.fingerprint = fingerprint
+
+    async def run(self, conn, work: Callable[[], Awaitable[Response]]) -> Response:
+        """Run work (which builds the response) once per idempotency key; without a key it always runs"""
+        if self.key is None:
+            return await work()
+
+        await self._lock(conn)
+        try:
+            stored = await IdempotencyDAO.get_response(conn, self.key)
+            if stored:
+                if stored['fingerprint'] != self.fingerprint:
+                    raise ParameterViolationException(
+                        message="This Idempotency-Key has already been used for a different request"
+                    )
+                return Response(content=stored['response_body'], status_code=stored['status_code'],
+                                media_type="application/json", headers={"Idempotent-Replayed": "true"})
+
+            response = await work()
+            if 200 <= response.status_code < 300:
+                await IdempotencyDAO.save_response(conn, self.key, self.fingerprint, response.status_code,
+                                                   response.body, get_settings().idempotency_key_ttl_seconds)
+            return response
+        finally:
+            if not conn.is_closed():
+                await conn.execute("SELECT pg_advisory_unlock($1, hashtext($2))", LOCK_NAMESPACE, self.key)
+
+    async def _lock(self, conn):
+        """Wait (up to idempotency_wait_seconds) for the session lock of the key
+
+        The wait is bounded with a transaction-local lock_timeout; the session lock itself outlives the transaction.
+        """
+        wait_ms = int(get_settings().idempotency_wait_seconds * 1000)
+        try:
+            async with conn.transaction():
+                await conn.execute(f"SET LOCAL lock_timeout = {wait_ms}")
+                await conn.execute("SELECT pg_advisory_lock($1, hashtext($2))", LOCK_NAMESPACE, self.key)
+        except asyncpg.LockNotAvailableError:
+            raise RestrictionException(
+                message="A request with this Idempotency-Key is still in progress. Please try again later."
+            )
+
+
+def depend_idempotency():
+    async def dependency(request: Request,
+                         idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key",
+                                                                 min_length=1, max_length=255)) -> IdempotentRequest:
+        digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode("utf-8"))
+        digest.update(await request.body())
+        return IdempotentRequest(idempotency_key, digest.hexdigest())
+    return Depends(dependency)
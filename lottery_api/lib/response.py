@@ -1,13 +1,23 @@
+import datetime
+import hashlib
+import json
 import math
+from decimal import Decimal
 from enum import Enum
 from typing import Generic, List, Optional, TypeVar, Any
+from uuid import UUID
 
-from fastapi.encoders import jsonable_encoder
+from fastapi import Response
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel as GenericModel
 
 from .base_exception import Page
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 STATUS = TypeVar('STATUS', bound=Enum)
 
 RESULT = TypeVar('RESULT')
@@ -52,6 +62,65 @@ class PageResponse(GenericModel, Generic[RESULT]):
         return PageResponse.create(page=page, page_size=page_size, total=total, result=result)
 
 
-def to_json_response(response: Any):
-    content = jsonable_encoder(response)
-    return JSONResponse(content=content)
+def _json_default(obj: Any) -> Any:
+    """Encode the types the JSON encoder does not handle natively, matching FastAPI's jsonable_encoder output"""
+    if isinstance(obj, GenericModel):
+        return obj.model_dump(by_alias=True)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        # A JSON number, as jsonable_encoder's decimal_encoder produces
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'keys') and hasattr(obj, 'items'):
+        # asyncpg.Record and other mappings
+        return dict(obj.items())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes in a single pass (orjson when installed, stdlib json otherwise)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_json_default, ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that serializes datetimes, UUIDs, Decimals and pydantic models natively"""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison, as RFC 9110 specifies for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def version_etag(version: Any, *params: Any) -> str:
+    """A strong ETag for a versioned resource, distinct for every set of query parameters"""
+    digest = hashlib.sha256(repr(params).encode("utf-8")).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def to_json_response(response: Any, etag: Optional[str] = None):
+    headers = {"ETag": etag} if etag else None
+    return FastJSONResponse(content=response, headers=headers)
@@ -1,7 +1,12 @@
 from asyncpg import IntegrityConstraintViolationError, ForeignKeyViolationError
 from fastapi import FastAPI
+from lottery_api.business_model.draw_scheduler import DrawScheduler
+from lottery_api.config import get_settings
+from lottery_api.data_access_object.db import Database
+from lottery_api.data_access_object.invalidation_bus import InvalidationBus
 from lottery_api.lib.base_exception import UniqueViolationException, ParameterViolationException, \
     hy_exception_to_json_response, add_exception_handler, use_route_names_as_operation_ids
+from lottery_api.lib.compression import CompressionMiddleware
 from lottery_api.lib.logger import get_prefix_logger_adapter
 from starlette.middleware.cors import CORSMiddleware
 
@@ -16,6 +21,13 @@ app.add_middleware(CORSMiddleware,
                    allow_methods=["GET", "POST", "OPTIONS", "DELETE"],
                    allow_headers=["*"]
                    )
+if get_settings().compression_enabled:
+    app.add_middleware(CompressionMiddleware,
+                       minimum_size=get_settings().compression_minimum_size,
+                       gzip_level=get_settings().compression_gzip_level,
+                       brotli_quality=get_settings().compression_brotli_quality,
+                       zstd_level=get_settings().compression_zstd_level
+                       )
 
 add_exception_handler(app)
 
@@ -30,6 +42,32 @@ async def db_foreignkey_exception_handler(request, exc: ForeignKeyViolationError
     return hy_exception_to_json_response(ParameterViolationException(message=str(exc)))
 
 
+@app.on_event("startup")
+async def start_cache_invalidation_listener():
+    InvalidationBus.start()
+
+
+@app.on_event("shutdown")
+async def stop_cache_invalidation_listener():
+    await InvalidationBus.stop()
+
+
+@app.on_event("startup")
+async def start_draw_scheduler():
+    if get_settings().draw_scheduler_enabled:
+        DrawScheduler.start()
+
+
+@app.on_event("shutdown")
+async def stop_draw_scheduler():
+    await DrawScheduler.stop()
+
+
+@app.on_event("shutdown")
+async def close_database_pool():
+    await Database.close_pool()
+
+
 # Register all API routers
 register_routers(app)
 
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Union
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from enum import Enum
 
 
@@ -28,12 +28,21 @@ class StudentType(str, Enum):
     DOMESTIC = "N"  # 本國生
 
 
+class DrawWeight(str, Enum):
+    """Enum for how participants are weighted in the draw"""
+    UNIFORM = "uniform"  # 每位參與者機會相同
+    COMPLETED_SURVEYS = "completed_surveys"  # 權重 = 1 + 已完成問卷數
+    COMPLETION_RATIO = "completion_ratio"  # 權重 = 1 + 已完成問卷數 / 應完成問卷數（最多 2）
+
+
 class LotteryEventBase(BaseModel):
     academic_year_term: str
     name: str
     description: str
     event_date: datetime
     type: LotteryEventType = LotteryEventType.GENERAL
+    draw_weight: DrawWeight = DrawWeight.UNIFORM
+    auto_draw: bool = False  # 啟用排程時，於 event_date 自動抽獎
 
 
 class LotteryEventCreate(LotteryEventBase):
@@ -47,6 +56,8 @@ class LotteryEventUpdate(BaseModel):
     description: Optional[str] = None
     event_date: Optional[datetime] = None
     type: Optional[LotteryEventType] = None
+    draw_weight: Optional[DrawWeight] = None
+    auto_draw: Optional[bool] = None
 
 
 class LotteryEvent(LotteryEventBase):
@@ -54,10 +65,20 @@ class LotteryEvent(LotteryEventBase):
     status: str
     is_deleted: bool = False
     created_at: datetime
+    draw_seed: Optional[str] = None  # 最近一次抽獎使用的種子
+    draw_pool_hash: Optional[str] = None  # 最近一次抽獎的抽獎池快照雜湊
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class LotteryEventWithCounts(LotteryEvent):
+    """Lottery event with optional aggregated counts (only filled when include_counts is requested)"""
+    participant_count: Optional[int] = None
+    prize_count: Optional[int] = None
+    prize_quantity: Optional[int] = None  # 所有獎項的總名額
+    winner_count: Optional[int] = None
+
+
 class StudentBase(BaseModel):
     """Base model for student data - removed personal information"""
     id: str
@@ -145,9 +166,30 @@ class FinalParticipantList(BaseModel):
     participants: List[FinalParticipant]
 
 
+class QuotaField(str, Enum):
+    """Enum for the student_info field a prize quota groups by"""
+    DEPARTMENT = "department"
+    GRADE = "grade"
+
+
+class PrizeQuota(BaseModel):
+    """Per-group constraints on the winners of a prize, e.g. at least 1 per department or max 10% per grade"""
+    field: QuotaField
+    min_per_group: int = Field(0, ge=0, description="Minimum winners from every group in the pool")
+    max_per_group: Optional[int] = Field(None, ge=1, description="Maximum winners from any one group")
+    max_ratio: Optional[float] = Field(None, gt=0, le=1, description="Maximum share of the prize quantity per group")
+
+    @model_validator(mode='after')
+    def check_bounds(self):
+        if self.max_per_group is not None and self.min_per_group > self.max_per_group:
+            raise ValueError('min_per_group cannot be greater than max_per_group')
+        return self
+
+
 class PrizeBase(BaseModel):
     name: str
     quantity: int
+    quota: Optional[PrizeQuota] = None
 
 
 class PrizeCreate(PrizeBase):
@@ -158,6 +200,8 @@ class Prize(PrizeBase):
     id: int
     event_id: str
     created_at: datetime
+    drawn_at: Optional[datetime] = None  # 已抽出的時間，未抽為 None
+    round_name: Optional[str] = None  # 分輪抽獎時所屬的輪次
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -165,6 +209,7 @@ class Prize(PrizeBase):
 class PrizeUpdate(BaseModel):
     name: Optional[str] = None
     quantity: Optional[int] = None
+    quota: Optional[PrizeQuota] = None  # send null explicitly to remove the quota
 
 
 class PrizeList(BaseModel):
@@ -175,6 +220,33 @@ class PrizeSettings(BaseModel):
     prizes: List[PrizeCreate]
 
 
+class PrizeSummary(Prize):
+    """Prize with its current fill status"""
+    winner_count: int = 0
+    is_filled: bool = False
+
+
+class ScheduledDraw(BaseModel):
+    """An auto_draw event and the state of its scheduled draw"""
+    event_id: str
+    name: str
+    event_date: datetime
+    status: str
+    owner: Optional[str] = None  # 持有（或最後持有）租約的排程節點
+    leased_until: Optional[datetime] = None
+    attempts: int = 0
+    last_error: Optional[str] = None
+    drawn_at: Optional[datetime] = None  # 排程抽獎成功的時間
+
+
+class EventSummary(LotteryEvent):
+    """Event metadata with prizes and counts, aggregated in a single query"""
+    participant_count: int = 0
+    eligible_count: int = 0  # 符合抽獎資格的參與者數量
+    winner_count: int = 0
+    prizes: List[PrizeSummary] = []
+
+
 class Winner(BaseModel):
     id: int
     event_id: str
@@ -200,15 +272,147 @@ class WinnersByPrize(BaseModel):
     prize_name: str
     quantity: int
     winners: List[Dict[str, Any]]
+    alternates: List[Dict[str, Any]] = []  # ranked alternates, only returned by the draw
+
+
+class AlternatesByPrize(BaseModel):
+    prize_id: int
+    prize_name: str
+    alternates: List[Dict[str, Any]]
+
+
+class PromoteAlternateResponse(BaseModel):
+    winner_id: int
+    prize_id: int
+    alternate_rank: int
+    replaced_winner_id: int
+    replaced_participant_id: int
+    winner: Dict[str, Any]
 
 
 class WinnersList(BaseModel):
     prizes: List[WinnersByPrize]
 
 
+class StudentResult(BaseModel):
+    """The result of one student in a lottery event, for the public result lookup"""
+    event_id: str
+    student_id: str
+    status: str  # 活動狀態；pending 表示尚未抽獎
+    won: bool
+    prize_name: Optional[str] = None
+
+
 class DrawRequest(BaseModel):
     event_id: str
-    
+
+
+class DrawOptions(BaseModel):
+    """Optional draw settings. Every draw is seeded; a random seed is generated when none is given."""
+    seed: Optional[str] = Field(None, min_length=1, max_length=255,
+                                description="Seed for a reproducible draw, e.g. a value committed before the draw")
+    alternates_per_prize: int = Field(0, ge=0, le=100, description="Ranked alternates to draw for every prize")
+    term_exclusive: bool = Field(False, description="Exclude students who already won an event of the same term")
+
+
+class BatchDrawRequest(BaseModel):
+    """Events to draw at once; the options apply to every event"""
+    event_ids: List[str] = Field(..., min_length=1, max_length=100)
+    seed: Optional[str] = Field(None, min_length=1, max_length=255,
+                                description="Batch seed; each event is drawn with the seed '<seed>:<event_id>'")
+    alternates_per_prize: int = Field(0, ge=0, le=100)
+    term_exclusive: bool = False
+
+
+class BatchDrawError(BaseModel):
+    code: str
+    message: str
+
+
+class BatchDrawResult(BaseModel):
+    event_id: str
+    success: bool
+    prizes: List[WinnersByPrize] = []
+    error: Optional[BatchDrawError] = None
+
+
+class DrawRoundRequest(BaseModel):
+    """One round of a round-based draw: the named subset of prizes to draw now"""
+    round_name: str = Field(..., min_length=1, max_length=255)
+    prize_ids: List[int] = Field(..., min_length=1)
+    seed: Optional[str] = Field(None, min_length=1, max_length=255)
+    alternates_per_prize: int = Field(0, ge=0, le=100)
+    term_exclusive: bool = False
+
+
+class DrawRoundResponse(BaseModel):
+    round_name: str
+    status: str  # in_progress, or drawn after the last round
+    prizes: List[WinnersByPrize]
+    remaining_prize_ids: List[int]
+
+
+class RoundPrize(BaseModel):
+    prize_id: int
+    prize_name: str
+    quantity: int
+    winner_count: int
+
+
+class DrawRound(BaseModel):
+    round_name: Optional[str] = None  # None for prizes drawn by a full draw
+    drawn_at: datetime
+    prizes: List[RoundPrize]
+
+
+class EventRounds(BaseModel):
+    event_id: str
+    status: str
+    rounds: List[DrawRound]
+    remaining_prizes: List[RoundPrize]
+
+
+class RedrawRequest(BaseModel):
+    """Prizes to re-draw; the winners of the other prizes are left untouched"""
+    prize_ids: List[int] = Field(..., min_length=1)
+    keep_existing: bool = Field(False, description="Only fill vacant places instead of replacing every winner")
+    seed: Optional[str] = Field(None, min_length=1, max_length=255)
+    term_exclusive: bool = False
+
+
+class RedrawnPrize(BaseModel):
+    prize_id: int
+    prize_name: str
+    quantity: int
+    replaced_winners_count: int
+    winners: List[Dict[str, Any]]  # the newly drawn winners
+
+
+class DrawAuditPrize(BaseModel):
+    prize_id: int
+    quantity: int
+    quota: Optional[PrizeQuota] = None
+    winner_ids: List[int]  # participant IDs in drawing order
+    alternate_ids: List[int] = []  # alternates in rank order, drawn after the winners of every prize
+
+
+class DrawAudit(BaseModel):
+    """Everything needed to replay a draw offline and check it against the published winners"""
+    event_id: str
+    seed: str
+    algorithm: str
+    numpy_version: str
+    pool_hash: str  # sha256 of the sorted participant IDs (little-endian int64), then the weights (float64)
+    pool_size: int
+    pool_ids: List[int]
+    draw_weight: DrawWeight = DrawWeight.UNIFORM
+    weights: Optional[List[float]] = None  # aligned with pool_ids, only for weighted draws
+    groups: Optional[Dict[str, List[int]]] = None  # quota group codes aligned with pool_ids, only for quota draws
+    draw_type: str = "draw"  # "draw", or "redraw" for a partial re-draw of some prizes
+    prizes: List[DrawAuditPrize]
+    verified: bool  # the pool hash matches and replaying with the seed gives the same winners
+    created_at: datetime
+
 
 class ExportWinnersResponse(BaseModel):
     file_url: str
@@ -0,0 +1,244 @@
+"""
+抽獎引擎
+抽獎池以 NumPy 陣列保存參與者 ID（與可選的權重欄），對整個抽獎池只做一次隨機排序，
+再依獎項順序切分中獎名單；只有被抽中的參與者才會再查詢完整資料。
+
+加權抽獎使用 Efraimidis–Spirakis 演算法：每位參與者取 key = log(u) / w，
+key 最大的前 k 位即為不重複的加權抽樣結果（依 key 由大到小即為抽出順序），
+只需一次向量化運算與 argpartition，成本與均等抽獎相同。
+
+有名額限制（依科系 / 年級分組）的獎項使用分層抽樣：每位參與者一個隨機 key，
+依 key 排序後以分組陣列一次算出組內名次，先取各組保底名額，再依 key 順序補滿且不超過各組上限。
+"""
+
+import hashlib
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+DRAW_ALGORITHM = "sha256-seeded numpy PCG64, Generator.choice(replace=False) sliced in prize order"
+WEIGHTED_DRAW_ALGORITHM = ("sha256-seeded numpy PCG64, Efraimidis-Spirakis keys log(Generator.random()) / weight "
+                           "in descending order, sliced in prize order")
+STRATIFIED_DRAW_ALGORITHM = ("sha256-seeded numpy PCG64, keys Generator.random() (log(Generator.random()) / "
+                             "weight when weighted) in stable descending order, quota prizes stratified by group rank")
+
+
+class QuotaInfeasibleError(ValueError):
+    """獎項的名額限制無法在目前的抽獎池中達成；prize_index 為該獎項在抽獎順序中的位置"""
+
+    def __init__(self, message: str, prize_index: Optional[int] = None):
+        super().__init__(message)
+        self.prize_index = prize_index
+
+
+def _parse_array(text: Optional[str], dtype) -> np.ndarray:
+    return np.fromstring(text, dtype=dtype, sep=',') if text else np.empty(0, dtype=dtype)
+
+
+class DrawPool:
+    """以 int64 陣列表示的抽獎池，取代每位參與者一個 dict 的清單
+
+    groups 為各分組欄位（department / grade）與 ID 對齊的 int32 分組代碼，
+    group_labels 為代碼對應的原始值（僅用於錯誤訊息）。
+    """
+
+    def __init__(self, ids, weights=None, groups: Optional[Dict[str, np.ndarray]] = None,
+                 group_labels: Optional[Dict[str, List[str]]] = None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        self.groups = {field: np.asarray(codes, dtype=np.int32) for field, codes in (groups or {}).items()}
+        self.group_labels = group_labels or {}
+
+    @classmethod
+    def from_text(cls, ids_text: Optional[str], weights_text: Optional[str] = None,
+                  groups_text: Optional[Dict[str, Optional[str]]] = None,
+                  group_labels: Optional[Dict[str, List[str]]] = None) -> "DrawPool":
+        """
+        由資料庫 string_agg 產生的逗號分隔字串建立抽獎池
+
+        直接解析成陣列，不需要先建立大量 Python int / Record 物件。
+        """
+        weights = None if weights_text is None else _parse_array(weights_text, np.float64)
+        groups = {field: _parse_array(text, np.int32) for field, text in (groups_text or {}).items()}
+        return cls(_parse_array(ids_text, np.int64), weights, groups, group_labels)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def snapshot_bytes(self) -> bytes:
+        """抽獎池快照：依序排列的 ID 以 little-endian int64 編碼"""
+        return self.ids.astype('<i8').tobytes()
+
+    def algorithm(self, stratified: bool = False) -> str:
+        """抽獎演算法說明；有任何獎項設定名額限制時（stratified）使用分層抽樣"""
+        if stratified:
+            return STRATIFIED_DRAW_ALGORITHM
+        return DRAW_ALGORITHM if self.weights is None else WEIGHTED_DRAW_ALGORITHM
+
+    def group_snapshot_bytes(self, field: str) -> Optional[bytes]:
+        """分組代碼快照：與 ID 快照對齊的 little-endian int32，沒有該分組時為 None"""
+        codes = self.groups.get(field)
+        return None if codes is None else codes.astype('<i4').tobytes()
+
+    def weights_snapshot_bytes(self) -> Optional[bytes]:
+        """權重快照：與 ID 快照對齊的 little-endian float64，均等抽獎時為 None"""
+        return None if self.weights is None else self.weights.astype('<f8').tobytes()
+
+    def snapshot_hash(self) -> str:
+        """抽獎池快照的 SHA-256，用於事後驗證抽獎池未被更動"""
+        digest = hashlib.sha256(self.snapshot_bytes())
+        if self.weights is not None:
+            digest.update(self.weights_snapshot_bytes())
+        for field in sorted(self.groups):
+            digest.update(field.encode('utf-8'))
+            digest.update(self.group_snapshot_bytes(field))
+        return digest.hexdigest()
+
+    def exclude(self, participant_ids) -> "DrawPool":
+        """回傳排除指定參與者後的新抽獎池"""
+        keep = ~np.isin(self.ids, np.asarray(participant_ids, dtype=np.int64))
+        return DrawPool(self.ids[keep], None if self.weights is None else self.weights[keep],
+                        {field: codes[keep] for field, codes in self.groups.items()}, self.group_labels)
+
+    def sample(self, k: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        不重複隨機抽出 k 個參與者 ID（依抽出順序排列）
+
+        k 超過抽獎池大小時以抽獎池大小為準；加權抽獎時權重為 0 的參與者不會被抽中。
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        if self.weights is not None:
+            return self._sample_weighted(k, rng)
+        k = min(k, len(self.ids))
+        positions = rng.choice(len(self.ids), size=k, replace=False, shuffle=True)
+        return self.ids[positions]
+
+    def _sample_weighted(self, k: int, rng: np.random.Generator) -> np.ndarray:
+        """Efraimidis–Spirakis 加權不重複抽樣，O(n + k log k)"""
+        candidates = np.flatnonzero(self.weights > 0)
+        k = min(k, len(candidates))
+        if k == 0:
+            return self.ids[:0]
+        keys = np.log(rng.random(len(candidates))) / self.weights[candidates]
+        top = np.argpartition(-keys, k - 1)[:k] if k < len(candidates) else np.arange(len(candidates))
+        order = top[np.argsort(-keys[top], kind='stable')]
+        return self.ids[candidates[order]]
+
+    def _keys(self, rng: np.random.Generator) -> np.ndarray:
+        """每位參與者的隨機排序 key（越大越先抽出），權重為 0 者為 -inf"""
+        if self.weights is None:
+            return rng.random(len(self.ids))
+        keys = np.full(len(self.ids), -np.inf)
+        candidates = self.weights > 0
+        keys[candidates] = np.log(rng.random(int(candidates.sum()))) / self.weights[candidates]
+        return keys
+
+    def _select_with_quota(self, free: np.ndarray, quantity: int, quota: dict) -> np.ndarray:
+        """
+        在尚未抽出的參與者（依 key 排序的位置陣列 free）中，依名額限制選出中獎者
+
+        Raises:
+            QuotaInfeasibleError: 名額限制無法達成
+        """
+        field = quota['field']
+        minimum = quota.get('min_per_group') or 0
+        cap = quota.get('max_per_group') or quantity
+        if quota.get('max_ratio') is not None:
+            cap = min(cap, int(np.floor(quota['max_ratio'] * quantity)))
+        if cap < max(minimum, 1):
+            raise QuotaInfeasibleError(f"max per {field} ({cap}) is less than the required {max(minimum, 1)}")
+        if not len(free):
+            return free
+
+        # 依分組穩定排序後，各組內仍維持 key 順序，即可一次算出每人的組內名次
+        codes = self.groups[field][free]
+        by_group = np.argsort(codes, kind='stable')
+        sorted_codes = codes[by_group]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        sizes = np.diff(np.r_[starts, len(codes)])
+        rank_in_group = np.empty(len(codes), dtype=np.int64)
+        rank_in_group[by_group] = np.arange(len(codes)) - np.repeat(starts, sizes)
+
+        if minimum:
+            short = sizes < minimum
+            if short.any():
+                labels = self.group_labels.get(field, [])
+                code = int(sorted_codes[starts[np.argmax(short)]])
+                label = labels[code] if code < len(labels) else code
+                raise QuotaInfeasibleError(f"{field} '{label}' has only {sizes[np.argmax(short)]} available participants, "
+                                           f"fewer than the minimum of {minimum}")
+            if len(sizes) * minimum > quantity:
+                raise QuotaInfeasibleError(f"{len(sizes)} {field} groups with at least {minimum} winners each exceed "
+                                           f"the quantity of {quantity}")
+        capacity = int(np.minimum(sizes, cap).sum())
+        if capacity < min(quantity, len(codes)):
+            raise QuotaInfeasibleError(f"at most {cap} winners per {field} allows only {capacity} winners, "
+                                       f"fewer than the quantity of {quantity}")
+
+        mandatory = rank_in_group < minimum
+        extra = np.flatnonzero(~mandatory & (rank_in_group < cap))[:max(quantity - int(mandatory.sum()), 0)]
+        return free[np.sort(np.r_[np.flatnonzero(mandatory), extra])]
+
+    def draw_prize_slices(self, quantities: Sequence[int], rng: Optional[np.random.Generator] = None,
+                          quotas: Optional[Sequence[Optional[dict]]] = None) -> List[List[int]]:
+        """
+        一次抽出所有獎項的名額，再依獎項順序切分中獎者
+
+        名額總數超過抽獎池大小時，排在後面的獎項會抽到較少（或沒有）中獎者，
+        與逐獎項抽獎的行為一致。quotas 與 quantities 對齊，有名額限制的獎項以分層抽樣選出；
+        所有限制都在回傳前檢查完畢，無法達成時拋出 QuotaInfeasibleError。
+
+        Returns:
+            List[List[int]]: 各獎項的中獎者 ID
+        """
+        if quotas is not None and any(quotas):
+            return self._draw_with_quotas(quantities, quotas, rng if rng is not None else np.random.default_rng())
+
+        drawn = self.sample(sum(quantities), rng)
+        slices = []
+        start = 0
+        for quantity in quantities:
+            end = min(start + quantity, len(drawn))
+            slices.append(drawn[start:end].tolist())
+            start = max(start, end)
+        return slices
+
+    def _draw_with_quotas(self, quantities: Sequence[int], quotas: Sequence[Optional[dict]],
+                          rng: np.random.Generator) -> List[List[int]]:
+        keys = self._keys(rng)
+        order = np.argsort(-keys, kind='stable')
+        order = order[np.isfinite(keys[order])]
+        taken = np.zeros(len(self.ids), dtype=bool)
+
+        slices = []
+        for index, (quantity, quota) in enumerate(zip(quantities, quotas)):
+            free = order[~taken[order]]
+            try:
+                selected = free[:quantity] if not quota else self._select_with_quota(free, quantity, quota)
+            except QuotaInfeasibleError as e:
+                raise QuotaInfeasibleError(str(e), index) from None
+            taken[selected] = True
+            slices.append(self.ids[selected].tolist())
+        return slices
+
+
+def rng_from_seed(seed: str) -> np.random.Generator:
+    """由字串種子（例如事先公布的承諾值）建立可重現的 NumPy 亂數產生器"""
+    return np.random.default_rng(int.from_bytes(hashlib.sha256(seed.encode('utf-8')).digest(), 'big'))
+
+
+def replay_draw(pool_ids, quantities: Sequence[int], seed: str, weights=None,
+                groups: Optional[Dict[str, np.ndarray]] = None,
+                quotas: Optional[Sequence[Optional[dict]]] = None) -> List[List[int]]:
+    """
+    依稽核紀錄重播抽獎，結果應與當初的中獎名單完全相同
+
+    Args:
+        pool_ids: 抽獎池快照（依 ID 排序）
+        quantities: 各獎項名額，依抽獎順序
+        seed: 抽獎時使用的種子
+        weights: 加權抽獎的權重快照（與 pool_ids 對齊），均等抽獎時為 None
+        groups: 分組代碼快照（與 pool_ids 對齊），沒有名額限制時為 None
+        quotas: 各獎項的名額限制，依抽獎順序
+    """
+    return DrawPool(pool_ids, weights, groups).draw_prize_slices(quantities, rng_from_seed(seed), quotas)
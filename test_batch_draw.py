@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+測試批次抽獎 API - 一次抽出多個活動，並回傳各活動的結果或錯誤
+"""
+
+import requests
+
+from api_test_helpers import BASE_URL, HEADERS, create_event_with_data
+
+
+def test_batch_draw():
+    """測試批次抽獎"""
+    print("=== 測試批次抽獎 API ===\n")
+
+    event_ids = [create_event_with_data(f"批次抽獎活動{i}", "測試批次抽獎") for i in range(3)]
+    no_prize_event_id = create_event_with_data("沒有獎項的活動", "測試批次抽獎", prizes=[])
+    missing_event_id = "00000000-0000-0000-0000-000000000000"
+    print(f"✓ 創建 {len(event_ids) + 1} 個測試活動")
+
+    # 1. 批次抽獎：各活動獨立抽出，失敗的活動不影響其他活動
+    response = requests.post(f"{BASE_URL}/events/batch-draw", json={
+        "event_ids": event_ids + [no_prize_event_id, missing_event_id],
+        "seed": "batch-seed"
+    }, headers=HEADERS)
+    assert response.status_code == 200
+    results = response.json()['result']
+    print("\n1. 批次抽獎結果")
+    for result in results:
+        print(f"  {result['event_id']}: 成功={result['success']}, "
+              f"中獎人數={sum(len(p['winners']) for p in result['prizes'])}, 錯誤={result['error']}")
+    assert [r['event_id'] for r in results] == event_ids + [no_prize_event_id, missing_event_id]
+    assert all(r['success'] and [len(p['winners']) for p in r['prizes']] == [1, 2] for r in results[:3])
+    assert results[3]['error']['code'] == '400700'
+    assert results[4]['error']['code'] == '404001'
+
+    # 2. 每個活動使用 "<seed>:<event_id>" 作為種子，且稽核紀錄可重播驗證
+    print("\n2. 抽獎稽核")
+    for event_id in event_ids:
+        audit = requests.get(f"{BASE_URL}/events/{event_id}/draw-audit", headers=HEADERS).json()['result']
+        print(f"  {event_id}: 種子={audit['seed']}, 驗證={audit['verified']}")
+        assert audit['seed'] == f"batch-seed:{event_id}"
+        assert audit['verified']
+
+    # 3. 已抽獎的活動不能再次抽獎
+    response = requests.post(f"{BASE_URL}/events/batch-draw", json={"event_ids": event_ids[:1]}, headers=HEADERS)
+    result = response.json()['result'][0]
+    print(f"\n3. 再次抽獎: 成功={result['success']} (預期 False)")
+    assert not result['success']
+
+    print("\n✓ 批次抽獎測試完成")
+
+
+if __name__ == "__main__":
+    test_batch_draw()
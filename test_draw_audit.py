@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+測試可重現的種子抽獎與抽獎稽核 API
+"""
+
+import requests
+
+from api_test_helpers import BASE_URL, HEADERS, create_event_with_data, make_students
+
+
+def winner_ids(draw_result):
+    return [[winner['participant_id'] for winner in prize['winners']] for prize in draw_result]
+
+
+def test_seeded_draw():
+    """測試相同種子重新抽獎會得到相同結果，且稽核紀錄可驗證"""
+    print("=== 測試種子抽獎 ===\n")
+
+    event_id = create_event_with_data("種子抽獎測試活動", "測試可重現抽獎", students=make_students(30),
+                                      prizes=[{"name": "頭獎", "quantity": 1}, {"name": "二獎", "quantity": 5}])
+    print(f"✓ 創建測試活動: {event_id}")
+
+    # 1. 使用種子抽獎
+    response = requests.post(f"{BASE_URL}/events/{event_id}/draw", json={"seed": "2024-commit"}, headers=HEADERS)
+    first = winner_ids(response.json()['result'])
+    event = requests.get(f"{BASE_URL}/events/{event_id}", headers=HEADERS).json()['result']
+    print(f"1. 種子: {event['draw_seed']}, 抽獎池雜湊: {event['draw_pool_hash']}")
+    assert event['draw_seed'] == "2024-commit"
+
+    # 2. 稽核紀錄
+    audit = requests.get(f"{BASE_URL}/events/{event_id}/draw-audit", headers=HEADERS).json()['result']
+    print(f"2. 抽獎池大小: {audit['pool_size']}, 驗證結果: {audit['verified']}")
+    assert audit['verified']
+    assert audit['pool_size'] == 30
+    assert [prize['winner_ids'] for prize in audit['prizes']] == first
+
+    # 3. 重置後以相同種子重新抽獎，結果相同
+    requests.delete(f"{BASE_URL}/events/{event_id}/winners", headers=HEADERS)
+    response = requests.post(f"{BASE_URL}/events/{event_id}/draw", json={"seed": "2024-commit"}, headers=HEADERS)
+    second = winner_ids(response.json()['result'])
+    print(f"3. 重新抽獎結果相同: {first == second}")
+    assert first == second
+
+    # 4. 不帶種子時會自動產生種子
+    requests.delete(f"{BASE_URL}/events/{event_id}/winners", headers=HEADERS)
+    requests.post(f"{BASE_URL}/events/{event_id}/draw", headers=HEADERS)
+    event = requests.get(f"{BASE_URL}/events/{event_id}", headers=HEADERS).json()['result']
+    print(f"4. 自動產生的種子: {event['draw_seed']}")
+    assert event['draw_seed']
+
+    print("\n✓ 種子抽獎測試完成")
+
+
+if __name__ == "__main__":
+    test_seeded_draw()
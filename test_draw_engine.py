@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+測試抽獎引擎 - 名額限制的分層抽樣與依稽核紀錄重播抽獎（不需啟動伺服器）
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from lottery_api.utils.draw_engine import DrawPool, QuotaInfeasibleError, replay_draw, rng_from_seed
+
+# 40 位參與者，分屬 4 個科系（代碼 0-3，各 10 人）
+IDS = np.arange(1, 41)
+DEPARTMENTS = np.repeat(np.arange(4, dtype=np.int32), 10)
+DEPARTMENT_OF = dict(zip(IDS.tolist(), DEPARTMENTS.tolist()))
+
+
+def department_pool():
+    return DrawPool(IDS, groups={"department": DEPARTMENTS}, group_labels={"department": ["D0", "D1", "D2", "D3"]})
+
+
+def test_quota_min_and_max_per_group():
+    """每個科系至少 1 名、最多 2 名，且各獎項的中獎者不重複"""
+    quotas = [{"field": "department", "min_per_group": 1, "max_per_group": 2}, None]
+    for seed in ("a", "b", "c", "d"):
+        slices = department_pool().draw_prize_slices([6, 10], rng_from_seed(seed), quotas)
+        counts = Counter(DEPARTMENT_OF[participant_id] for participant_id in slices[0])
+        assert len(slices[0]) == 6 and len(slices[1]) == 10
+        assert set(counts) == {0, 1, 2, 3} and max(counts.values()) <= 2
+        assert not set(slices[0]) & set(slices[1])
+
+
+def test_quota_max_ratio():
+    """單一科系不超過名額的 25%"""
+    quotas = [{"field": "department", "max_ratio": 0.25}]
+    slices = department_pool().draw_prize_slices([8], rng_from_seed("ratio"), quotas)
+    counts = Counter(DEPARTMENT_OF[participant_id] for participant_id in slices[0])
+    assert len(slices[0]) == 8 and max(counts.values()) <= 2
+
+
+def test_quota_infeasible():
+    """無法達成的名額限制拋出 QuotaInfeasibleError，並指出是第幾個獎項"""
+    cases = [
+        ([3], [{"field": "department", "min_per_group": 1}]),                  # 4 個科系各 1 名超過名額 3
+        ([1, 8], [None, {"field": "department", "max_per_group": 1}]),         # 每科系最多 1 名只能抽出 4 名
+        ([12], [{"field": "department", "min_per_group": 11}]),                # 每科系只有 10 人
+    ]
+    for quantities, quotas in cases:
+        try:
+            department_pool().draw_prize_slices(quantities, rng_from_seed("x"), quotas)
+        except QuotaInfeasibleError as e:
+            assert e.prize_index == len(quotas) - 1
+        else:
+            raise AssertionError(f"quota {quotas} should be infeasible")
+
+
+def test_replay_draw_matches_seeded_draw():
+    """以相同種子與抽獎池快照重播，結果與原本的抽獎完全相同"""
+    weights = np.linspace(0.5, 2.0, len(IDS))
+    groups = {"department": DEPARTMENTS}
+    quotas = [{"field": "department", "min_per_group": 1}, None]
+    for pool_weights, pool_quotas in ((None, None), (weights, None), (None, quotas), (weights, quotas)):
+        pool = DrawPool(IDS, pool_weights, groups)
+        drawn = pool.draw_prize_slices([4, 5], rng_from_seed("commit"), pool_quotas)
+        replayed = replay_draw(pool.ids.astype('<i8'), [4, 5], "commit", pool_weights, groups, pool_quotas)
+        assert replayed == drawn
+        assert replay_draw(pool.ids, [4, 5], "other", pool_weights, groups, pool_quotas) != drawn
+
+
+def test_weighted_draw_skips_zero_weights():
+    """加權抽獎時權重為 0 的參與者不會被抽中"""
+    weights = np.where(IDS % 2 == 0, 1.0, 0.0)
+    drawn = DrawPool(IDS, weights).draw_prize_slices([30], rng_from_seed("w"))
+    assert len(drawn[0]) == 20 and all(participant_id % 2 == 0 for participant_id in drawn[0])
+
+
+if __name__ == "__main__":
+    test_quota_min_and_max_per_group()
+    test_quota_max_ratio()
+    test_quota_infeasible()
+    test_replay_draw_matches_seeded_draw()
+    test_weighted_draw_skips_zero_weights()
+    print("✓ 抽獎引擎測試完成")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+測試活動摘要 API - 一次取得活動、獎項、參與者/符合資格/中獎人數
+"""
+
+import requests
+
+from api_test_helpers import BASE_URL, HEADERS, create_event_with_data as create_test_event, make_students
+
+
+def create_event_with_data():
+    """創建測試活動並加入參與者與獎項"""
+    students = make_students(10, prefix="41100")
+    students.append({"id": "411009999", "name": "", "department": "資工系", "grade": "3"})  # 沒有名字，不符合資格
+    return create_test_event("摘要測試活動", "測試 summary API", students=students,
+                             prizes=[{"name": "頭獎", "quantity": 1}, {"name": "二獎", "quantity": 3}])
+
+
+def test_event_summary():
+    """測試活動摘要"""
+    print("=== 測試活動摘要 API ===\n")
+
+    event_id = create_event_with_data()
+    print(f"✓ 創建測試活動: {event_id}")
+
+    # 1. 抽獎前的摘要
+    response = requests.get(f"{BASE_URL}/events/{event_id}/summary", headers=HEADERS)
+    summary = response.json()['result']
+    print("\n1. 抽獎前的摘要")
+    print(f"  參與者人數: {summary['participant_count']} (預期 11)")
+    print(f"  符合資格人數: {summary['eligible_count']} (預期 10)")
+    print(f"  中獎人數: {summary['winner_count']} (預期 0)")
+    assert summary['participant_count'] == 11
+    assert summary['eligible_count'] == 10
+    assert summary['winner_count'] == 0
+    assert [p['is_filled'] for p in summary['prizes']] == [False, False]
+
+    # 2. 抽獎後的摘要
+    requests.post(f"{BASE_URL}/events/{event_id}/draw", headers=HEADERS)
+    summary = requests.get(f"{BASE_URL}/events/{event_id}/summary", headers=HEADERS).json()['result']
+    print("\n2. 抽獎後的摘要")
+    print(f"  狀態: {summary['status']}")
+    for prize in summary['prizes']:
+        print(f"  {prize['name']}: {prize['winner_count']}/{prize['quantity']} (已額滿: {prize['is_filled']})")
+    assert summary['status'] == 'drawn'
+    assert summary['winner_count'] == 4
+    assert all(p['is_filled'] for p in summary['prizes'])
+
+    # 3. 不存在的活動
+    response = requests.get(f"{BASE_URL}/events/00000000-0000-0000-0000-000000000000/summary", headers=HEADERS)
+    print(f"\n3. 不存在的活動回傳: {response.status_code} (預期 404)")
+    assert response.status_code == 404
+
+    print("\n✓ 活動摘要測試完成")
+
+
+def test_event_list_with_counts():
+    """測試活動列表的統計數量與 keyset 分頁"""
+    print("\n=== 測試活動列表統計與分頁 ===\n")
+
+    event_id = create_event_with_data()
+
+    # 1. 含統計數量的列表
+    response = requests.get(f"{BASE_URL}/events", params={"limit": 5, "include_counts": True}, headers=HEADERS)
+    events = response.json()['result']
+    event = next(e for e in events if e['id'] == event_id)
+    print(f"1. 參與者: {event['participant_count']}, 獎項: {event['prize_count']}, "
+          f"名額: {event['prize_quantity']}, 中獎者: {event['winner_count']}")
+    assert event['participant_count'] == 11
+    assert event['prize_count'] == 2
+    assert event['prize_quantity'] == 4
+    assert event['winner_count'] == 0
+
+    # 2. keyset 分頁結果應與 offset 分頁一致
+    first_page = requests.get(f"{BASE_URL}/events", params={"limit": 2}, headers=HEADERS).json()['result']
+    last = first_page[-1]
+    next_page = requests.get(f"{BASE_URL}/events", params={
+        "limit": 2, "after_created_at": last['created_at'], "after_id": last['id']
+    }, headers=HEADERS).json()['result']
+    offset_page = requests.get(f"{BASE_URL}/events", params={"limit": 2, "offset": 2}, headers=HEADERS).json()['result']
+    print(f"2. keyset 下一頁: {[e['id'] for e in next_page]}")
+    assert [e['id'] for e in next_page] == [e['id'] for e in offset_page]
+
+    print("\n✓ 活動列表測試完成")
+
+
+if __name__ == "__main__":
+    test_event_summary()
+    test_event_list_with_counts()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+測試回應壓縮的編碼協商與 If-None-Match 比對（不需啟動伺服器）
+"""
+
+from lottery_api.lib.compression import CompressionMiddleware
+from lottery_api.lib.response import etag_matches
+
+
+def middleware(*encodings):
+    """只提供指定編碼（依偏好順序）的壓縮中介層，不受 brotli / zstandard 是否安裝影響"""
+    compression = CompressionMiddleware(app=None)
+    compression.compressors = {encoding: compression.compressors["gzip"] for encoding in encodings}
+    return compression
+
+
+def test_negotiate_prefers_server_order():
+    compression = middleware("zstd", "br", "gzip")
+    assert compression.negotiate("gzip, deflate, br") == "br"
+    assert compression.negotiate("gzip, br, zstd") == "zstd"
+    assert compression.negotiate("GZIP") == "gzip"
+    assert compression.negotiate("*") == "zstd"
+
+
+def test_negotiate_respects_quality():
+    compression = middleware("zstd", "br", "gzip")
+    assert compression.negotiate("zstd;q=0, br;q=0.5, gzip") == "br"
+    assert compression.negotiate("*;q=0, gzip") == "gzip"
+    assert compression.negotiate("br;q=0, *") == "zstd"
+    assert compression.negotiate("gzip;q=invalid") is None
+    assert compression.negotiate("gzip;q=0") is None
+
+
+def test_negotiate_without_acceptable_encoding():
+    compression = middleware("gzip")
+    assert compression.negotiate("") is None
+    assert compression.negotiate("identity") is None
+    assert compression.negotiate("br, zstd") is None
+
+
+def test_etag_matches():
+    etag = '"3-abc"'
+    assert etag_matches('"3-abc"', etag)
+    assert etag_matches('W/"3-abc"', etag)
+    assert etag_matches('"2-abc", W/"3-abc"', etag)
+    assert etag_matches(' * ', etag)
+    assert not etag_matches('"2-abc"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('', etag)
+
+
+if __name__ == "__main__":
+    test_negotiate_prefers_server_order()
+    test_negotiate_respects_quality()
+    test_negotiate_without_acceptable_encoding()
+    test_etag_matches()
+    print("✓ 壓縮協商與 ETag 比對測試完成")
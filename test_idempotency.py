@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+測試 Idempotency-Key - 重試的匯入 / 抽獎請求直接取得第一次的結果，不會重複執行
+"""
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from api_test_helpers import BASE_URL, DEFAULT_PRIZES, HEADERS, create_event, make_students
+
+
+def post_with_key(path, body, key):
+    return requests.post(f"{BASE_URL}{path}", json=body, headers={**HEADERS, "Idempotency-Key": key})
+
+
+def test_idempotent_import_and_draw():
+    """測試匯入與抽獎的重試"""
+    print("=== 測試 Idempotency-Key ===\n")
+
+    event_id = create_event("冪等測試活動", "測試 Idempotency-Key")
+    print(f"✓ 創建測試活動: {event_id}")
+
+    # 1. 重試匯入：回傳相同結果，不會再次匯入
+    students = {"students": make_students(10, prefix="41300")}
+    key = str(uuid.uuid4())
+    first = post_with_key(f"/events/{event_id}/participants", students, key)
+    retry = post_with_key(f"/events/{event_id}/participants", students, key)
+    print(f"\n1. 匯入: {first.status_code}, 重試: {retry.status_code}, "
+          f"重播標頭: {retry.headers.get('Idempotent-Replayed')}")
+    assert first.status_code == retry.status_code == 200
+    assert first.content == retry.content
+    assert retry.headers.get('Idempotent-Replayed') == 'true'
+
+    requests.post(f"{BASE_URL}/events/{event_id}/prizes",
+                  json={"prizes": DEFAULT_PRIZES}, headers=HEADERS)
+
+    # 2. 同時送出的重試會等待第一次抽獎完成，所有請求都取得同一份中獎名單
+    key = str(uuid.uuid4())
+    with ThreadPoolExecutor(4) as executor:
+        responses = list(executor.map(lambda _: post_with_key(f"/events/{event_id}/draw", None, key), range(4)))
+    print(f"\n2. 同時抽獎: {[r.status_code for r in responses]}, 不同結果數: {len({r.content for r in responses})}")
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.content for r in responses}) == 1
+
+    # 3. 同一個 key 用在不同的請求內容會被拒絕
+    response = post_with_key(f"/events/{event_id}/draw", {"seed": "different"}, key)
+    print(f"\n3. 不同請求內容: {response.status_code} (預期 400)")
+    assert response.status_code == 400
+
+    # 4. 沒有 key 的重複抽獎仍然會被拒絕
+    response = requests.post(f"{BASE_URL}/events/{event_id}/draw", headers=HEADERS)
+    print(f"\n4. 沒有 key 的重複抽獎: {response.status_code} (預期 400)")
+    assert response.status_code == 400
+
+    print("\n✓ Idempotency-Key 測試完成")
+
+
+if __name__ == "__main__":
+    test_idempotent_import_and_draw()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+測試 JSON 回應序列化 - 輸出須與 FastAPI jsonable_encoder 相同（不需啟動伺服器）
+"""
+
+import datetime
+import json
+import uuid
+from contextlib import nullcontext
+from decimal import Decimal
+from enum import Enum
+from unittest import mock
+
+from fastapi.encoders import jsonable_encoder
+
+from lottery_api.lib.response import SingleResponse, json_dumps
+
+
+class Status(Enum):
+    DRAWN = "drawn"
+
+
+CONTENT = {
+    "decimals": [Decimal("1.5"), Decimal("3"), Decimal("-0.25"), Decimal("1E+2")],
+    "utc": datetime.datetime(2024, 12, 31, 10, 0, tzinfo=datetime.timezone.utc),
+    "taipei": datetime.datetime(2024, 12, 31, 18, 0, 0, 123456, tzinfo=datetime.timezone(datetime.timedelta(hours=8))),
+    "naive": datetime.datetime(2024, 12, 31, 10, 0),
+    "date": datetime.date(2024, 12, 31),
+    "duration": datetime.timedelta(minutes=1, seconds=30),
+    "id": uuid.UUID("f8f800d5-15bf-47fe-a86d-900f92fa032b"),
+    "status": Status.DRAWN,
+    "name": "測試學生",
+    "model": SingleResponse(result={"count": 3}),
+}
+
+
+def test_json_dumps_matches_jsonable_encoder():
+    expected = jsonable_encoder(CONTENT)
+    assert json.loads(json_dumps(CONTENT)) == expected
+    with mock.patch("lottery_api.lib.response.orjson", None):
+        assert json.loads(json_dumps(CONTENT)) == expected
+
+
+def test_wire_format_of_decimals_and_utc_datetimes():
+    """Decimal 為 JSON 數字，UTC 時間為 +00:00（不是 Z）"""
+    for patch in (nullcontext(), mock.patch("lottery_api.lib.response.orjson", None)):
+        with patch:
+            body = json_dumps({"amount": Decimal("1.5"), "at": CONTENT["utc"]}).decode("utf-8").replace(" ", "")
+        assert body == '{"amount":1.5,"at":"2024-12-31T10:00:00+00:00"}'
+
+
+if __name__ == "__main__":
+    test_json_dumps_matches_jsonable_encoder()
+    test_wire_format_of_decimals_and_utc_datetimes()
+    print("✓ JSON 序列化測試完成")
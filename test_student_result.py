@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+測試學生查詢中獎結果 - 不需登入，以學號查詢自己是否中獎
+"""
+
+import requests
+
+from api_test_helpers import BASE_URL, HEADERS, create_event_with_data, student_id
+
+
+def test_student_result():
+    """測試中獎查詢"""
+    print("=== 測試學生查詢中獎結果 ===\n")
+
+    event_id = create_event_with_data("中獎查詢測試活動", "測試學生查詢中獎結果")
+    print(f"✓ 創建測試活動: {event_id}")
+
+    # 1. 尚未抽獎：狀態為 pending，沒有人中獎
+    result = requests.get(f"{BASE_URL}/events/{event_id}/results/{student_id(0)}").json()['result']
+    print(f"\n1. 抽獎前: {result}")
+    assert result['status'] == 'pending' and not result['won']
+
+    response = requests.post(f"{BASE_URL}/events/{event_id}/draw", headers=HEADERS)
+    winners = [winner for prize in response.json()['result'] for winner in prize['winners']]
+    print(f"✓ 抽出 {len(winners)} 位得獎者")
+
+    # 2. 抽獎後：不需 Authorization 標頭也能查詢，每位學生的結果與中獎名單一致
+    won = []
+    for i in range(10):
+        result = requests.get(f"{BASE_URL}/events/{event_id}/results/{student_id(i)}").json()['result']
+        assert result['status'] == 'drawn'
+        if result['won']:
+            won.append(result['prize_name'])
+    print(f"\n2. 抽獎後查詢: 中獎人數 {len(won)}, 獎項 {sorted(won)}")
+    assert sorted(won) == sorted(prize['prize_name'] for prize in response.json()['result'] for _ in prize['winners'])
+
+    # 3. 重置抽獎後，查詢結果立即更新
+    requests.delete(f"{BASE_URL}/events/{event_id}/winners", headers=HEADERS)
+    results = [requests.get(f"{BASE_URL}/events/{event_id}/results/{student_id(i)}").json()['result'] for i in range(10)]
+    print(f"\n3. 重置後中獎人數: {sum(r['won'] for r in results)} (預期 0)")
+    assert not any(r['won'] for r in results)
+
+    # 4. 不存在的活動
+    response = requests.get(f"{BASE_URL}/events/not-an-event/results/{student_id(0)}")
+    print(f"\n4. 不存在的活動: {response.status_code} (預期 404)")
+    assert response.status_code == 404
+
+    print("\n✓ 中獎查詢測試完成")
+
+
+if __name__ == "__main__":
+    test_student_result()
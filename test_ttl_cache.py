@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+測試 TTLCache - 有效期限與 LRU 淘汰（不需啟動伺服器）
+"""
+
+from unittest import mock
+
+from lottery_api.lib.cache import TTLCache
+
+
+def test_entries_expire_after_ttl():
+    """項目在存入 ttl 秒後失效"""
+    cache = TTLCache(max_size=10, ttl=30)
+    with mock.patch("lottery_api.lib.cache.time.monotonic", return_value=100.0):
+        cache.set("event", {"id": "event"})
+        assert cache.get("event") == {"id": "event"}
+    with mock.patch("lottery_api.lib.cache.time.monotonic", return_value=129.0):
+        assert "event" in cache
+    with mock.patch("lottery_api.lib.cache.time.monotonic", return_value=131.0):
+        assert cache.get("event", "missing") == "missing"
+        assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    """超過 max_size 時淘汰最久未使用的項目"""
+    cache = TTLCache(max_size=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1 and cache.get("b") is None and cache.get("c") == 3
+
+
+def test_invalidate_and_clear():
+    cache = TTLCache(max_size=10, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert "a" not in cache and "b" in cache
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_disabled_cache_stores_nothing():
+    """ttl 或 max_size 為 0 時停用快取"""
+    for cache in (TTLCache(max_size=0, ttl=30), TTLCache(max_size=10, ttl=0)):
+        cache.set("a", 1)
+        assert cache.get("a") is None
+
+
+if __name__ == "__main__":
+    test_entries_expire_after_ttl()
+    test_least_recently_used_entry_is_evicted()
+    test_invalidate_and_clear()
+    test_disabled_cache_stores_nothing()
+    print("✓ TTLCache 測試完成")